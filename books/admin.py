@@ -1,9 +1,10 @@
 from django.contrib import admin
 
-from.models import User, Author, Book
+from.models import User, Author, Book, ImportJob
 
 # Register your models here.
 
 admin.site.register(User)
 admin.site.register(Author)
 admin.site.register(Book)
+admin.site.register(ImportJob)
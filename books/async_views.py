@@ -0,0 +1,44 @@
+from asgiref.sync import sync_to_async
+
+from django.db import close_old_connections
+from django.shortcuts import redirect, render
+
+from books.forms import GoogleApiForm
+from books.functions import get_query
+from books.jobs import submit_job
+from books.views import BookList
+
+
+async def book_import(request):
+
+    if request.method == 'GET':
+        form = GoogleApiForm()
+
+    elif request.method == 'POST':
+        form = GoogleApiForm(request.POST)
+        if form.is_valid():
+            # Queued for the run_import_jobs worker, like the sync view.
+            query = get_query(**form.cleaned_data)
+            job = await sync_to_async(submit_job)(query)
+            return redirect('import_job_detail', pk=job.pk)
+        return redirect('book_list')
+
+    return render(request, 'books/book_import.html', {'form': form})
+
+
+book_list_view = BookList.as_view()
+
+
+def run_book_list(request, *args, **kwargs):
+    # Runs on a pool thread with its own database connection, so requests
+    # are served concurrently instead of queueing on the single
+    # thread-sensitive thread.
+    close_old_connections()
+    try:
+        return book_list_view(request, *args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def book_list(request, *args, **kwargs):
+    return await sync_to_async(run_book_list, thread_sensitive=False)(request, *args, **kwargs)
@@ -0,0 +1,110 @@
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+
+from . import stats
+from .cache import bump_catalogue_version
+from .models import Author, Book, get_authors_display, normalize_author_name
+from .signals import authors_changed
+
+
+def backfill_name_keys(chunk_size):
+    while True:
+        with transaction.atomic():
+            authors = list(Author.objects.filter(name_key__isnull=True).only('name').order_by('id')[:chunk_size])
+            for author in authors:
+                author.name_key = normalize_author_name(author.name)
+            Author.objects.bulk_update(authors, ['name_key'])
+        if not authors:
+            return
+        yield len(authors)
+
+
+def get_duplicates(after=None):
+    authors = Author.objects.filter(name_key__isnull=False)
+    if after is not None:
+        authors = authors.filter(name_key__gt=after)
+    return authors.values('name_key').annotate(count=Count('id')).filter(count__gt=1).order_by('name_key')
+
+
+def count_duplicates():
+    return get_duplicates().aggregate(groups=Count('name_key'), authors=Sum('count'))
+
+
+def delete_authors(author_ids):
+    # Their book links are already gone, so skip the per-row delete signals.
+    table = connection.ops.quote_name(Author._meta.db_table)
+    placeholders = ', '.join(['%s'] * len(author_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table} WHERE id IN ({placeholders})', list(author_ids))
+
+
+def merge_authors(keys, refresh=True):
+    # Keep the oldest author for every key and move the others' books to it.
+    # Without refresh only the author and link tables are touched, as
+    # before migration 0009 the columns and tables behind them are missing.
+    keep = {}
+    replace = {}
+    names = []
+    authors = Author.objects.filter(name_key__in=keys).order_by('id').values_list('id', 'name_key', 'name')
+    for author_id, key, name in authors:
+        if key in keep:
+            replace[author_id] = keep[key]
+            names.append(name)
+        else:
+            keep[key] = author_id
+
+    BookAuthor = Book.author.through
+    rows = list(BookAuthor.objects.filter(author_id__in=replace).values_list('id', 'book_id', 'author_id'))
+    book_ids = {book_id for _, book_id, _ in rows}
+    linked = set(
+        BookAuthor.objects.filter(author_id__in=keep.values(), book_id__in=book_ids).values_list('book_id', 'author_id')
+    )
+    repeated = []
+    moved = []
+    for row_id, book_id, author_id in rows:
+        link = (book_id, replace[author_id])
+        if link in linked:
+            repeated.append(row_id)
+        else:
+            linked.add(link)
+            moved.append(BookAuthor(id=row_id, book_id=book_id, author_id=link[1]))
+
+    BookAuthor.objects.filter(id__in=repeated).delete()
+    BookAuthor.objects.bulk_update(moved, ['author_id'])
+    delete_authors(replace)
+    if refresh:
+        authors_changed(book_ids)
+        stats.remove_authors(names)
+        stats.count_authors(keep.values())
+    return len(replace)
+
+
+def merge_duplicate_authors(chunk_size, refresh=True):
+    after = None
+    while True:
+        keys = list(get_duplicates(after).values_list('name_key', flat=True)[:chunk_size])
+        if not keys:
+            return
+        with transaction.atomic():
+            merged = merge_authors(keys, refresh)
+            if refresh:
+                transaction.on_commit(bump_catalogue_version)
+        after = keys[-1]
+        yield merged
+
+
+def backfill_authors_display(chunk_size):
+    last_id = None
+    while True:
+        books = Book.objects.order_by('id').only('id')
+        if last_id is not None:
+            books = books.filter(id__gt=last_id)
+        books = list(books[:chunk_size])
+        if not books:
+            return
+        display = get_authors_display([book.id for book in books])
+        for book in books:
+            book.authors_display = display.get(book.id, '')
+        Book.objects.bulk_update(books, ['authors_display'])
+        last_id = books[-1].id
+        yield len(books)
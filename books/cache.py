@@ -0,0 +1,296 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.db.models import Count, F, Max
+from django.dispatch import receiver
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+from .client import get_client, parse_json, UpstreamError
+from .metrics import CallbackMetric
+from .models import Book, Author, CatalogueVersion
+
+
+class LRUCache:
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            try:
+                self.entries.move_to_end(key)
+            except KeyError:
+                return None
+            return self.entries[key]
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+def normalize_url(url):
+    scheme, netloc, path, query, _ = urlsplit(url.strip())
+    params = sorted(
+        (key, ' '.join(value.split()))
+        for key, value in parse_qsl(query, keep_blank_values=True)
+    )
+    return urlunsplit((scheme.lower(), netloc.lower(), path, urlencode(params), ''))
+
+
+def get_cache_key(url):
+    return 'google-books:' + hashlib.sha1(normalize_url(url).encode()).hexdigest()
+
+
+class ResponseCache:
+
+    def __init__(self, ttl=None, stale_ttl=None, maxsize=None):
+        self.ttl = ttl if ttl is not None else settings.GOOGLE_BOOKS_CACHE_TTL
+        self.stale_ttl = stale_ttl if stale_ttl is not None else settings.GOOGLE_BOOKS_CACHE_STALE_TTL
+        self.local = LRUCache(maxsize or settings.GOOGLE_BOOKS_CACHE_SIZE)
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidations': self.revalidations,
+            'size': len(self.local)
+        }
+
+    def store(self, key, entry):
+        self.local.set(key, entry)
+        cache.set(key, entry, self.ttl + self.stale_ttl)
+
+    def load(self, key):
+        entry = self.local.get(key)
+        if entry is None:
+            entry = cache.get(key)
+            if entry is not None:
+                self.local.set(key, entry)
+        return entry
+
+    def get_fresh_data(self, entry):
+        if entry is not None and entry['expires'] > time.time():
+            self.hits += 1
+            return entry['data']
+
+    def get_headers(self, entry):
+        if entry is not None and entry['etag']:
+            return {'If-None-Match': entry['etag']}
+        return {}
+
+    def update(self, url, entry, r):
+        now = time.time()
+        if r.status_code == 304 and entry is not None:
+            self.revalidations += 1
+            return dict(entry, expires=now + self.ttl)
+        self.misses += 1
+        if not 200 <= r.status_code < 300:
+            raise UpstreamError(f'{r.status_code} response for {url}')
+        return {'etag': r.headers.get('ETag'), 'data': parse_json(r), 'expires': now + self.ttl}
+
+    def get_json(self, url):
+        if not self.ttl:
+            return get_client().get_json(url)
+
+        key = get_cache_key(url)
+        entry = self.load(key)
+        data = self.get_fresh_data(entry)
+        if data is not None:
+            return data
+
+        r = get_client().get(url, headers=self.get_headers(entry))
+        entry = self.update(url, entry, r)
+        self.store(key, entry)
+        return entry['data']
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache()
+        return _response_cache
+
+
+@receiver(setting_changed)
+def reset_response_cache(setting, **kwargs):
+    global _response_cache
+    if setting.startswith('GOOGLE_BOOKS_CACHE_'):
+        with _response_cache_lock:
+            _response_cache = None
+
+
+def get_catalogue_stamp(request=None):
+    if request is not None and hasattr(request, '_catalogue_stamp'):
+        return request._catalogue_stamp
+    stamp = CatalogueVersion.objects.filter(pk=1).values_list('version', 'updated_at').first() or (0, None)
+    if request is not None:
+        request._catalogue_stamp = stamp
+    return stamp
+
+
+def get_catalogue_version(request=None):
+    return get_catalogue_stamp(request)[0]
+
+
+def bump_catalogue_version():
+    versions = CatalogueVersion.objects.filter(pk=1)
+    if not versions.update(version=F('version') + 1, updated_at=timezone.now()):
+        CatalogueVersion.objects.get_or_create(pk=1)
+        versions.update(version=F('version') + 1, updated_at=timezone.now())
+
+
+def get_author_choices(request=None):
+    # None means there are too many authors for a select box.
+    key = f'author-choices:{get_catalogue_version(request)}'
+    choices = cache.get(key)
+    if choices is None:
+        limit = settings.BOOKS_AUTHOR_CHOICES_LIMIT
+        names = list(Author.objects.order_by('name').values_list('name', flat=True).distinct()[:limit + 1])
+        choices = [(name, name) for name in names] if len(names) <= limit else False
+        # Keys of old versions expire instead of piling up.
+        cache.set(key, choices, settings.BOOKS_AUTHOR_CHOICES_TIMEOUT)
+    return choices or None
+
+
+class PageCacheStats:
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def as_dict(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+page_cache_stats = PageCacheStats()
+
+
+CallbackMetric(
+    'books_response_cache_requests_total',
+    'Google Books response cache lookups in this process, by result',
+    'counter',
+    ['result'],
+    lambda: {
+        (result,): value
+        for result, value in get_response_cache().stats().items()
+        if result != 'size'
+    }
+)
+CallbackMetric(
+    'books_page_cache_requests_total',
+    'Rendered page cache lookups in this process, by result',
+    'counter',
+    ['result'],
+    lambda: {(result,): value for result, value in page_cache_stats.as_dict().items()}
+)
+
+
+def get_page_cache_key(request):
+    params = sorted(
+        (key, value)
+        for key, values in request.GET.lists()
+        for value in values
+        if value
+    )
+    # API pages link to the next ones with absolute URLs built from the
+    # request, so the scheme and host are part of the key.
+    request_key = '|'.join([
+        request.scheme,
+        request.get_host(),
+        request.path,
+        urlencode(params),
+        request.META.get('HTTP_ACCEPT', '')
+    ])
+    digest = hashlib.sha1(request_key.encode()).hexdigest()
+    return f'page:{get_catalogue_version(request)}:{digest}'
+
+
+def cache_catalogue_page(view):
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        timeout = settings.BOOKS_PAGE_CACHE_TIMEOUT
+        if request.method not in ('GET', 'HEAD') or not timeout:
+            return view(request, *args, **kwargs)
+
+        key = get_page_cache_key(request)
+        response = cache.get(key)
+        if response is not None:
+            page_cache_stats.hits += 1
+            return response
+        page_cache_stats.misses += 1
+
+        response = view(request, *args, **kwargs)
+
+        def store(response):
+            # Pages that hand out a CSRF token or cookies are per-client.
+            if (response.status_code == 200 and not response.cookies
+                    and not request.META.get('CSRF_COOKIE_USED')):
+                cache.set(key, response, timeout)
+
+        if hasattr(response, 'add_post_render_callback') and not response.is_rendered:
+            response.add_post_render_callback(store)
+        elif not response.streaming:
+            store(response)
+        return response
+
+    return wrapper
+
+
+def get_catalogue_state(request):
+    if not hasattr(request, '_catalogue_state'):
+        request._catalogue_state = Book.objects.aggregate(
+            last_modified=Max('updated_at'),
+            count=Count('pk')
+        )
+    return request._catalogue_state
+
+
+def get_catalogue_etag(request, *args, **kwargs):
+    # The version also covers author writes, which the book list's author
+    # select shows but which leave the books untouched.
+    state = get_catalogue_state(request)
+    version = get_catalogue_version(request)
+    value = f"{version}:{state['last_modified']}:{state['count']}:{request.META.get('HTTP_ACCEPT', '')}"
+    return hashlib.md5(value.encode()).hexdigest()
+
+
+def get_catalogue_last_modified(request, *args, **kwargs):
+    # Deleting the newest book would move Max(updated_at) backwards.
+    stamps = [get_catalogue_state(request)['last_modified'], get_catalogue_stamp(request)[1]]
+    stamps = [stamp for stamp in stamps if stamp is not None]
+    return max(stamps) if stamps else None
+
+
+catalogue_condition = condition(
+    etag_func=get_catalogue_etag,
+    last_modified_func=get_catalogue_last_modified
+)
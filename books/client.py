@@ -0,0 +1,156 @@
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .metrics import IMPORT_STAGE_SECONDS, UPSTREAM_REQUEST_SECONDS
+
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class UpstreamError(Exception):
+    pass
+
+
+class CircuitOpenError(UpstreamError):
+    pass
+
+
+class CircuitBreaker:
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.half_open = False
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Half-open: one trial call per reset timeout, whose outcome
+                # closes or re-opens the circuit.
+                self.opened_at = time.monotonic()
+                self.half_open = True
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.half_open = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.half_open or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                self.half_open = False
+
+
+def parse_json(r):
+    with IMPORT_STAGE_SECONDS.time('parse'):
+        return r.json()
+
+
+class UpstreamClient:
+
+    def __init__(self, timeout=None, retries=None, backoff=None, max_backoff=None,
+                 pool_size=None, failure_threshold=None, reset_timeout=None):
+        self.timeout = timeout if timeout is not None else settings.UPSTREAM_TIMEOUT
+        self.retries = retries if retries is not None else settings.UPSTREAM_RETRIES
+        self.backoff = backoff if backoff is not None else settings.UPSTREAM_BACKOFF
+        self.max_backoff = max_backoff if max_backoff is not None else settings.UPSTREAM_MAX_BACKOFF
+        self.failure_threshold = failure_threshold or settings.UPSTREAM_BREAKER_THRESHOLD
+        self.reset_timeout = reset_timeout if reset_timeout is not None else settings.UPSTREAM_BREAKER_RESET
+        pool_size = pool_size or settings.UPSTREAM_POOL_SIZE
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.breakers = {}
+        self.lock = threading.Lock()
+
+    def get_breaker(self, url):
+        host = urlsplit(url).netloc
+        with self.lock:
+            if host not in self.breakers:
+                self.breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return self.breakers[host]
+
+    def observe(self, url, start, status):
+        UPSTREAM_REQUEST_SECONDS.observe(time.perf_counter() - start, urlsplit(url).netloc, str(status))
+
+    def get_delay(self, attempt):
+        # Exponential backoff with full jitter.
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def get(self, url, timeout=None, **kwargs):
+        breaker = self.get_breaker(url)
+        if not breaker.allow():
+            raise CircuitOpenError(f'Circuit open for {url}')
+
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.get_delay(attempt - 1))
+            start = time.perf_counter()
+            try:
+                r = self.session.get(url, timeout=timeout or self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self.observe(url, start, 'error')
+                error = e
+                continue
+            self.observe(url, start, r.status_code)
+            if r.status_code in RETRY_STATUSES:
+                error = requests.HTTPError(f'{r.status_code} response', response=r)
+                # Read the error body so a streamed connection returns to the pool.
+                r.content
+                r.close()
+                continue
+            breaker.record_success()
+            return r
+
+        breaker.record_failure()
+        raise UpstreamError(f'GET {url} failed after {self.retries + 1} attempts') from error
+
+    def get_json(self, url, **kwargs):
+        r = self.get(url, **kwargs)
+        try:
+            r.raise_for_status()
+        except requests.HTTPError as e:
+            raise UpstreamError(str(e)) from e
+        return parse_json(r)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = UpstreamClient()
+        return _client
+
+
+@receiver(setting_changed)
+def reset_client(setting, **kwargs):
+    global _client
+    if setting.startswith('UPSTREAM_'):
+        with _client_lock:
+            _client = None
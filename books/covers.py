@@ -0,0 +1,196 @@
+import hashlib
+import ipaddress
+import os
+import socket
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .client import get_client, UpstreamError
+
+
+# Raster formats only: an SVG served from our origin could run scripts.
+CONTENT_TYPES = {'image/gif', 'image/jpeg', 'image/png', 'image/webp'}
+
+
+class CoverError(UpstreamError):
+    pass
+
+
+def check_cover_url(url):
+    # Image URLs come from users and upstream data, so they must not
+    # reach hosts on our own network.
+    parts = urlsplit(url)
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        raise CoverError(f'Not an HTTP URL: {url}')
+    if settings.BOOKS_COVER_ALLOW_PRIVATE_HOSTS:
+        return
+    try:
+        addresses = socket.getaddrinfo(parts.hostname, parts.port or parts.scheme, proto=socket.IPPROTO_TCP)
+    except (socket.gaierror, ValueError) as e:
+        raise CoverError(f'Cannot resolve {parts.hostname}') from e
+    for *_, sockaddr in addresses:
+        address = ipaddress.ip_address(sockaddr[0].split('%')[0])
+        if getattr(address, 'ipv4_mapped', None):
+            address = address.ipv4_mapped
+        if not address.is_global:
+            raise CoverError(f'{parts.hostname} resolves to a non-public address')
+
+
+def get_url_key(url):
+    return hashlib.sha256(url.encode()).hexdigest()
+
+
+def write_file(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as f:
+        f.write(data)
+    os.replace(f.name, path)
+
+
+class CoverStore:
+    # Images are stored once per content hash under blobs/, and refs/ maps
+    # every image URL to its blob. Blob mtimes record the last use.
+
+    def __init__(self, directory, max_size):
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.size = None
+        self.lock = threading.Lock()
+
+    def get_blob_path(self, digest):
+        return self.directory / 'blobs' / digest[:2] / digest
+
+    def get_ref_path(self, url):
+        key = get_url_key(url)
+        return self.directory / 'refs' / key[:2] / key
+
+    def get(self, url):
+        try:
+            digest, content_type = self.get_ref_path(url).read_text().split(' ', 1)
+        except (FileNotFoundError, ValueError):
+            return None
+        path = self.get_blob_path(digest)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path, digest, content_type
+
+    def put(self, url, content, content_type):
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.get_blob_path(digest)
+        added = 0
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            write_file(path, content)
+            added = len(content)
+        write_file(self.get_ref_path(url), f'{digest} {content_type}'.encode())
+
+        with self.lock:
+            if self.size is None:
+                self.size = sum(size for _, size, _ in self.iter_blobs())
+            else:
+                self.size += added
+            if self.size > self.max_size:
+                self.evict()
+        return digest
+
+    def iter_blobs(self):
+        blobs = self.directory / 'blobs'
+        if not blobs.is_dir():
+            return
+        for prefix in os.scandir(blobs):
+            for entry in os.scandir(prefix.path):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                yield stat.st_mtime, stat.st_size, entry.path
+
+    def evict(self):
+        # Rescan, as other processes share the directory.
+        blobs = sorted(self.iter_blobs())
+        size = sum(blob_size for _, blob_size, _ in blobs)
+        for _, blob_size, path in blobs:
+            if size <= self.max_size:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            size -= blob_size
+        self.size = size
+
+
+def fetch_cover(url):
+    store = get_cover_store()
+    cached = store.get(url)
+    if cached is not None and cached[2] in CONTENT_TYPES:
+        return cached[1]
+
+    check_cover_url(url)
+    # Redirects are not followed, as their targets would skip the check.
+    r = get_client().get(url, stream=True, allow_redirects=False)
+    try:
+        if r.status_code != 200:
+            raise CoverError(f'GET {url} returned {r.status_code}')
+        content_type = r.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type not in CONTENT_TYPES:
+            raise CoverError(f'GET {url} returned {content_type or "no content type"}')
+        chunks = []
+        size = 0
+        for chunk in r.iter_content(64 * 1024):
+            size += len(chunk)
+            if size > settings.BOOKS_COVER_MAX_BYTES:
+                raise CoverError(f'GET {url} returned more than {settings.BOOKS_COVER_MAX_BYTES} bytes')
+            chunks.append(chunk)
+    finally:
+        r.close()
+    return store.put(url, b''.join(chunks), content_type)
+
+
+_cover_store = None
+_executor = None
+_pending = {}
+_lock = threading.Lock()
+
+
+def get_cover_store():
+    global _cover_store
+    with _lock:
+        if _cover_store is None:
+            _cover_store = CoverStore(settings.BOOKS_COVER_DIR, settings.BOOKS_COVER_CACHE_SIZE)
+        return _cover_store
+
+
+def prefetch_cover(url):
+    global _executor
+    with _lock:
+        if url in _pending:
+            return _pending[url]
+        if _executor is None:
+            _executor = ThreadPoolExecutor(settings.BOOKS_COVER_WORKERS, thread_name_prefix='covers')
+        future = _pending[url] = _executor.submit(fetch_cover, url)
+
+    def done(future):
+        with _lock:
+            _pending.pop(url, None)
+
+    future.add_done_callback(done)
+    return future
+
+
+@receiver(setting_changed)
+def reset_cover_store(setting, **kwargs):
+    global _cover_store
+    if setting.startswith('BOOKS_COVER_'):
+        with _lock:
+            _cover_store = None
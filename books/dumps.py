@@ -0,0 +1,117 @@
+import gzip
+import json
+import re
+from itertools import islice
+
+
+CHUNK_SIZE = 1 << 16
+
+NDJSON_SUFFIXES = ('.ndjson', '.jsonl')
+
+WHITESPACE = re.compile(r'\s*')
+
+decoder = json.JSONDecoder()
+
+
+class JsonReader:
+
+    def __init__(self, stream, chunk_size=CHUNK_SIZE):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+
+    def fill(self):
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                raise ValueError('Unexpected end of JSON')
+
+    def take(self, char):
+        if self.peek() != char:
+            raise ValueError(f'Expected {char!r}, got {self.buffer[self.pos]!r}')
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # A number cut off by the end of the buffer still decodes.
+            if end == len(self.buffer) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+    def iter_array(self):
+        self.take('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() != ',':
+                break
+            self.pos += 1
+        self.take(']')
+
+
+def iter_json_records(stream, chunk_size=CHUNK_SIZE):
+    reader = JsonReader(stream, chunk_size)
+    if reader.peek() == '[':
+        yield from reader.iter_array()
+        return
+
+    reader.take('{')
+    while reader.peek() != '}':
+        key = reader.value()
+        reader.take(':')
+        if key == 'items' and reader.peek() == '[':
+            yield from reader.iter_array()
+        else:
+            reader.value()
+        if reader.peek() == ',':
+            reader.pos += 1
+
+
+def iter_ndjson_records(stream, skip=0):
+    lines = (line for line in stream if line.strip())
+    for line in islice(lines, skip, None):
+        yield json.loads(line)
+
+
+def iter_records(stream, format, skip=0):
+    if format == 'ndjson':
+        return iter_ndjson_records(stream, skip)
+    return islice(iter_json_records(stream), skip, None)
+
+
+def get_items(record):
+    if 'volumeInfo' in record:
+        return [record]
+    return record.get('items', [])
+
+
+def get_format(path):
+    name = path[:-3] if path.endswith('.gz') else path
+    return 'ndjson' if name.endswith(NDJSON_SUFFIXES) else 'json'
+
+
+def open_dump(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, encoding='utf-8')
@@ -0,0 +1,63 @@
+import csv
+import json
+
+from django.conf import settings
+
+from .models import AUTHORS_SEPARATOR
+
+
+EXPORT_FIELDS = [
+    'id',
+    'title',
+    'authors',
+    'publication_date',
+    'isbn',
+    'pages',
+    'image_url',
+    'language'
+]
+BOOK_FIELDS = [field for field in EXPORT_FIELDS if field != 'authors'] + ['authors_display']
+
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def iter_books(queryset, chunk_size=None):
+    chunk_size = chunk_size or settings.BOOKS_EXPORT_CHUNK_SIZE
+    rows = queryset.order_by().values_list(*BOOK_FIELDS).iterator(chunk_size=chunk_size)
+    for row in rows:
+        book = dict(zip(BOOK_FIELDS, row))
+        authors = book.pop('authors_display')
+        book['authors'] = authors.split(AUTHORS_SEPARATOR) if authors else []
+        yield book
+
+
+def to_ndjson(books):
+    for book in books:
+        yield json.dumps(book, default=str) + '\n'
+
+
+class Echo:
+
+    def write(self, value):
+        return value
+
+
+def to_csv(books):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for book in books:
+        book['authors'] = AUTHORS_SEPARATOR.join(book['authors'])
+        yield writer.writerow([book[field] for field in EXPORT_FIELDS])
+
+
+WRITERS = {
+    'ndjson': to_ndjson,
+    'csv': to_csv,
+}
+
+
+def export_books(queryset, export_format, chunk_size=None):
+    return WRITERS[export_format](iter_books(queryset, chunk_size))
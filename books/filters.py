@@ -1,21 +1,31 @@
 import django_filters
 
 from django import forms
+from django.urls import reverse_lazy
 
+from .cache import get_author_choices
 from .models import Book, Author
+from .search import search_books
+
+
+def filter_search(queryset, name, value):
+    return search_books(queryset, value)
 
 
 class BookFilter(django_filters.FilterSet):
 
+    q = django_filters.CharFilter(
+        method=filter_search,
+        widget=forms.TextInput(attrs={'class': 'form-control me-2', 'placeholder': 'Search'})
+    )
     title = django_filters.CharFilter(
         field_name='title',
         lookup_expr='icontains',
         widget=forms.TextInput(attrs={'class': 'form-control me-2', 'placeholder': 'Title'})
     )
-    author = django_filters.ModelChoiceFilter(
+    author = django_filters.ChoiceFilter(
         field_name='author__name',
-        to_field_name='name',
-        queryset=Author.objects.all(),
+        choices=get_author_choices,
         widget=forms.Select(attrs={'class': 'form-select'})
     )
     language = django_filters.CharFilter(
@@ -43,9 +53,29 @@ class BookFilter(django_filters.FilterSet):
             'publication_date'
         ]
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        choices = get_author_choices(self.request)
+        if choices is not None:
+            self.filters['author'].extra['choices'] = choices
+        else:
+            author = django_filters.CharFilter(
+                field_name='author__name',
+                widget=forms.TextInput(attrs={
+                    'class': 'form-control me-2',
+                    'placeholder': 'Author',
+                    'list': 'author-choices',
+                    'data-autocomplete-url': reverse_lazy('author_autocomplete')
+                })
+            )
+            author.model = self._meta.model
+            author.parent = self
+            self.filters['author'] = author
+
 
 class ApiBookFilter(django_filters.rest_framework.FilterSet):
 
+    q = django_filters.CharFilter(method=filter_search)
     title = django_filters.CharFilter(
         field_name='title',
         lookup_expr='icontains'
@@ -1,6 +1,6 @@
 from django import forms
 from django.core.exceptions import ValidationError
-from .models import Book, Author
+from .models import Book, Author, normalize_author_name
 
 
 class BookForm(forms.ModelForm):
@@ -41,8 +41,19 @@ class AuthorForm(forms.ModelForm):
         model = Author
         fields = ['name']
 
+    def clean_name(self):
+        name = self.cleaned_data['name']
+        if Author.objects.filter(name_key=normalize_author_name(name)).exists():
+            raise ValidationError('An author with this name already exists.')
+        return name
 
-AuthorFormset = forms.formset_factory(AuthorForm, extra=3, max_num=3)
+
+class AuthorNameForm(forms.Form):
+
+    name = forms.CharField(widget=forms.TextInput(attrs={'class': 'input', 'placeholder': 'Author name'}), label='', max_length=200, required=False)
+
+
+AuthorFormset = forms.formset_factory(AuthorNameForm, extra=3, max_num=3)
 
 
 class GoogleApiForm(forms.Form):
@@ -1,6 +1,14 @@
-import requests
+from django.db import transaction
+
+from .cache import get_response_cache, bump_catalogue_version
+from .metrics import IMPORT_ITEMS, IMPORT_STAGE_SECONDS
+from .models import AUTHORS_SEPARATOR, Book, Author, get_authors_display, normalize_author_name
+from .normalize import normalize_volumes
+from . import search, stats
+
+
+REFRESH_FIELDS = ['title', 'publication_date', 'pages', 'image_url', 'language']
 
-from .models import Book, Author
 
 def get_query(key_word='', title='', author='', isbn=''):
 
@@ -72,43 +80,114 @@ def validate_pages(info):
         return info['pageCount']
     
 
-def get_books_from_google(query):
-
-    r = requests.get(query)
-    response = r.json()
+def get_author_keys(names):
+    keys = {name: normalize_author_name(name) for name in names}
+    return {name: key for name, key in keys.items() if key}
+
+
+def resolve_authors(names):
+    keys = get_author_keys(names)
+    if not keys:
+        return {}
+    authors = dict(Author.objects.filter(name_key__in=keys.values()).values_list('name_key', 'id'))
+    missing = {key: name for name, key in keys.items() if key not in authors}
+    if missing:
+        Author.objects.bulk_create([Author(name=missing[key]) for key in sorted(missing)], ignore_conflicts=True)
+        authors.update(Author.objects.filter(name_key__in=missing).values_list('name_key', 'id'))
+    return {name: authors[key] for name, key in keys.items()}
+
+
+def get_stale_books(books, stored):
+    stale = []
+    for isbn, book_id, *values in stored:
+        book = books[isbn][0]
+        for field in REFRESH_FIELDS:
+            setattr(book, field, Book._meta.get_field(field).to_python(getattr(book, field)))
+        if values != [getattr(book, field) for field in REFRESH_FIELDS]:
+            book.id = book_id
+            stale.append(book)
+    return stale
+
+
+def import_volumes(items, refresh=False):
+
+    with IMPORT_STAGE_SECONDS.time('normalize'):
+        books = {}
+        for isbn, row in normalize_volumes(items).items():
+            book = Book(
+                title=row.title,
+                publication_date=row.publication_date,
+                isbn=isbn,
+                pages=row.pages,
+                image_url=row.image_url,
+                language=row.language
+            )
+            books[isbn] = (book, row.authors)
+
+    # Volumes without an ISBN or title, or repeated within the page.
+    IMPORT_ITEMS.inc('skipped', amount=len(items) - len(books))
+    if not books:
+        return 0
+
+    with IMPORT_STAGE_SECONDS.time('write'), transaction.atomic():
+        # Inserts skip rows another import already stored, so concurrent
+        # imports of the same volumes or authors cannot race. Rows are
+        # written in key order so overlapping imports, such as sharded
+        # workers sharing authors, wait on each other instead of deadlocking.
+        keys = get_author_keys(name for _, authors_list in books.values() for name in authors_list)
+        # The first spelling of a new author becomes its display name.
+        names = {key: name for name, key in reversed(list(keys.items()))}
+        Author.objects.bulk_create([Author(name=names[key]) for key in sorted(names)], ignore_conflicts=True)
+        stored_authors = Author.objects.filter(name_key__in=keys.values()).values_list('name_key', 'id', 'name')
+        authors = {key: (author_id, name) for key, author_id, name in stored_authors}
+        links = {}
+        for isbn, (book, authors_list) in books.items():
+            links[isbn] = list(dict.fromkeys(authors[keys[name]] for name in authors_list if name in keys))
+            book.authors_display = AUTHORS_SEPARATOR.join(name for _, name in links[isbn])
+
+        Book.objects.bulk_create([books[isbn][0] for isbn in sorted(books)], ignore_conflicts=True)
+        stored = Book.objects.filter(isbn__in=books).values_list('isbn', 'id', *REFRESH_FIELDS)
+        created = {isbn for isbn, book_id, *_ in stored if book_id == books[isbn][0].id}
+        stale = []
+        if refresh:
+            stale = get_stale_books(books, sorted(row for row in stored if row[0] not in created))
+            Book.objects.bulk_update(stale, REFRESH_FIELDS + ['updated_at'])
+
+        changed = sorted([books[isbn][0] for isbn in created] + stale, key=lambda book: book.isbn)
+        BookAuthor = Book.author.through
+        BookAuthor.objects.bulk_create([
+            BookAuthor(book_id=book.id, author_id=author_id)
+            for book in changed
+            for author_id, _ in links[book.isbn]
+        ], ignore_conflicts=True)
+        if stale:
+            # Refreshed books keep their old links, so read the names back.
+            authors_display = get_authors_display([book.id for book in stale])
+            for book in stale:
+                book.authors_display = authors_display.get(book.id, '')
+            Book.objects.bulk_update(stale, ['authors_display'])
+        previous = {isbn: dict(zip(REFRESH_FIELDS, values)) for isbn, _, *values in stored}
+        stats.count_books(
+            added=[(book.language, book.publication_date) for book in changed],
+            removed=[(previous[book.isbn]['language'], previous[book.isbn]['publication_date']) for book in stale]
+        )
+        stats.count_authors(author_id for book in changed for author_id, _ in links[book.isbn])
+        if changed:
+            search.index_books([book.id for book in changed])
+            transaction.on_commit(bump_catalogue_version)
+
+    IMPORT_ITEMS.inc('imported', amount=len(created))
+    IMPORT_ITEMS.inc('refreshed', amount=len(stale))
+    IMPORT_ITEMS.inc('existing', amount=len(books) - len(created) - len(stale))
+    return len(created)
+
+
+def get_books_from_google(query, refresh=False):
+
+    with IMPORT_STAGE_SECONDS.time('fetch'):
+        response = get_response_cache().get_json(query)
     imported_books = 0
 
     if response['totalItems']:
-        for item in response['items']:
-            item_info = item['volumeInfo']
-            title = validate_title(item_info)
-            date = validate_date(item_info)
-            authors_list = validate_authors(item_info)
-            isbn = validate_isbn(item_info)
-            language = validate_language(item_info)
-            image_url = validate_image_url(item_info)
-            pages = validate_pages(item_info)
-            
-            if isbn is not None and title is not None:
-                if not Book.objects.filter(isbn=isbn).exists():
-                    book = Book.objects.create(
-                        title=title,
-                        publication_date=date,
-                        isbn=isbn,
-                        pages=pages,
-                        image_url=image_url,
-                        language=language
-                    )                  
-                    book.save()
-
-                    imported_books += 1
-
-                    for author_name in authors_list:
-                        try:
-                            author = Author.objects.get(name=author_name)
-                        except Author.DoesNotExist:
-                            author = Author.objects.create(name=author_name)
-
-                        book.author.add(author)
-                    book.save()
-    return imported_books
\ No newline at end of file
+        imported_books = import_volumes(response.get('items', []), refresh)
+    return imported_books
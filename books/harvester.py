@@ -0,0 +1,79 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+
+from .cache import get_response_cache
+from .functions import import_volumes
+from .metrics import IMPORT_STAGE_SECONDS
+
+
+MAX_RESULTS = 40
+
+
+class RateLimiter:
+
+    def __init__(self, rate=None):
+        self.interval = 1 / rate if rate else 0
+        self.next_call = 0
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        if not self.interval:
+            return 0
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_call - now
+            self.next_call = max(now, self.next_call) + self.interval
+        return max(delay, 0)
+
+    def wait(self):
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+
+def get_page_query(query, start_index, max_results=MAX_RESULTS):
+    return f'{query}&startIndex={start_index}&maxResults={max_results}'
+
+
+def fetch_page(query, start_index, limiter):
+    limiter.wait()
+    with IMPORT_STAGE_SECONDS.time('fetch'):
+        return get_response_cache().get_json(get_page_query(query, start_index))
+
+
+def harvest(query, workers=None, rate_limit=None, max_items=None):
+    workers = workers or settings.GOOGLE_BOOKS_WORKERS
+    max_items = max_items or settings.GOOGLE_BOOKS_MAX_ITEMS
+    limiter = RateLimiter(rate_limit or settings.GOOGLE_BOOKS_RATE_LIMIT)
+
+    response = fetch_page(query, 0, limiter)
+    total_items = min(response.get('totalItems', 0), max_items)
+    yield response.get('items', [])
+
+    start_indexes = range(MAX_RESULTS, total_items, MAX_RESULTS)
+    if not start_indexes:
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(fetch_page, query, start_index, limiter)
+            for start_index in start_indexes
+        ]
+        try:
+            for future in as_completed(futures):
+                yield future.result().get('items', [])
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def import_harvest(query, on_page=None, refresh=False, **options):
+    imported_books = 0
+    for items in harvest(query, **options):
+        imported_books += import_volumes(items, refresh)
+        if on_page is not None:
+            on_page(len(items), imported_books)
+    return imported_books
@@ -0,0 +1,93 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import metrics
+from .harvester import import_harvest
+from .models import ImportJob
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def submit_job(query, max_items=None):
+    return ImportJob.objects.create(query=query, max_items=max_items)
+
+
+def cancel_job(job):
+    ImportJob.objects.filter(pk=job.pk, status=ImportJob.PENDING).update(
+        status=ImportJob.CANCELLED,
+        cancel_requested=True,
+        finished_at=timezone.now()
+    )
+    ImportJob.objects.filter(pk=job.pk, status=ImportJob.RUNNING).update(
+        cancel_requested=True
+    )
+    expire_jobs()
+    job.refresh_from_db()
+
+
+def expire_jobs():
+    # A running job whose worker stopped sending heartbeats died with it.
+    now = timezone.now()
+    stale = ImportJob.objects.filter(
+        status=ImportJob.RUNNING,
+        heartbeat_at__lt=now - timedelta(seconds=settings.GOOGLE_BOOKS_JOB_LEASE)
+    )
+    stale.filter(cancel_requested=True).update(status=ImportJob.CANCELLED, finished_at=now)
+    return stale.update(status=ImportJob.FAILED, error='Import worker stopped responding', finished_at=now)
+
+
+def claim_job():
+    expire_jobs()
+    pending = ImportJob.objects.filter(status=ImportJob.PENDING)
+    for pk in pending.values_list('pk', flat=True)[:10]:
+        now = timezone.now()
+        claimed = ImportJob.objects.filter(pk=pk, status=ImportJob.PENDING).update(
+            status=ImportJob.RUNNING,
+            started_at=now,
+            heartbeat_at=now
+        )
+        if claimed:
+            return ImportJob.objects.get(pk=pk)
+
+
+def run_job(job):
+    jobs = ImportJob.objects.filter(pk=job.pk)
+
+    def on_page(items, imported_books):
+        job.fetched_items += items
+        job.imported_books = imported_books
+        jobs.update(fetched_items=job.fetched_items, imported_books=imported_books, heartbeat_at=timezone.now())
+        if jobs.filter(cancel_requested=True).exists():
+            raise JobCancelled
+        metrics.maybe_flush()
+
+    try:
+        import_harvest(job.query, on_page=on_page, max_items=job.max_items)
+    except JobCancelled:
+        job.status = ImportJob.CANCELLED
+    except Exception as e:
+        job.status = ImportJob.FAILED
+        job.error = repr(e)
+    else:
+        job.status = ImportJob.DONE
+
+    job.finished_at = timezone.now()
+    jobs.update(status=job.status, error=job.error, finished_at=job.finished_at)
+    metrics.flush()
+    return job
+
+
+def work(poll_interval=1.0, once=False, stop=None):
+    while stop is None or not stop.is_set():
+        job = claim_job()
+        if job is not None:
+            run_job(job)
+        elif once:
+            return
+        else:
+            time.sleep(poll_interval)
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from books.authors import backfill_authors_display
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized author names stored on every book'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Books per batch')
+
+    def handle(self, *args, **options):
+        updated = 0
+        for count in backfill_authors_display(options['chunk_size']):
+            updated += count
+            self.stdout.write(f'Updated {updated} books')
+        self.stdout.write(self.style.SUCCESS(f'Backfilled authors for {updated} books'))
@@ -0,0 +1,68 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from books.functions import validate_authors, validate_date, validate_image_url
+from books.functions import validate_isbn, validate_language, validate_pages, validate_title
+from books.normalize import normalize_volumes
+
+
+def synthetic_volume(i):
+    return {
+        'volumeInfo': {
+            'title': f'Title {i}',
+            'authors': [f'Author {i % 1000}', f'Author {i % 7}'],
+            'publishedDate': ('2003', '2003-05', '2003-05-17')[i % 3],
+            'industryIdentifiers': [
+                {'type': 'ISBN_10', 'identifier': str(1000000000 + i)},
+                {'type': 'ISBN_13', 'identifier': str(9780000000000 + i)},
+            ],
+            'pageCount': 100 + i % 500,
+            'imageLinks': {'smallThumbnail': f'https://example.com/{i}-s.jpg', 'thumbnail': f'https://example.com/{i}.jpg'},
+            'language': 'en'
+        }
+    }
+
+
+def validate_volumes(items):
+    rows = {}
+    for item in items:
+        info = item['volumeInfo']
+        title = validate_title(info)
+        isbn = validate_isbn(info)
+        if isbn is not None and title is not None and isbn not in rows:
+            rows[isbn] = (
+                title,
+                validate_date(info),
+                validate_pages(info),
+                validate_image_url(info),
+                validate_language(info),
+                list(dict.fromkeys(validate_authors(info)))
+            )
+    return rows
+
+
+class Command(BaseCommand):
+    help = 'Time the volume normalizer against the per-field validators on synthetic volumes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--volumes', type=int, default=100000)
+        parser.add_argument('--page-size', type=int, default=40)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        items = [synthetic_volume(i) for i in range(options['volumes'])]
+        page_size = options['page_size']
+        pages = [items[i:i + page_size] for i in range(0, len(items), page_size)]
+
+        for name, normalize in (('validate_*', validate_volumes), ('normalize_volumes', normalize_volumes)):
+            best = None
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                for page in pages:
+                    normalize(page)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            self.stdout.write(
+                f'{name}: {best:.3f}s for {len(items)} volumes, {best / len(items) * 1e6:.2f} us/volume'
+            )
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+
+from books.authors import backfill_name_keys, count_duplicates, merge_duplicate_authors
+from books.models import Author
+
+
+class Command(BaseCommand):
+    help = 'Merge authors whose names differ only in case, spacing or Unicode form'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Authors or name keys per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the duplicates')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        # Run between migrations 0008 and 0009 to shorten 0009, when only the
+        # author and link tables can be written.
+        executor = MigrationExecutor(connection)
+        migrated = not executor.migration_plan(executor.loader.graph.leaf_nodes())
+        if options['dry_run']:
+            unkeyed = Author.objects.filter(name_key__isnull=True).count()
+            self.stdout.write(f'{unkeyed} authors without a name key')
+        else:
+            keyed = 0
+            for count in backfill_name_keys(chunk_size):
+                keyed += count
+                self.stdout.write(f'Keyed {keyed} authors')
+
+        duplicates = count_duplicates()
+        self.stdout.write(
+            f'{duplicates["groups"]} names shared by {duplicates["authors"] or 0} authors'
+        )
+        if options['dry_run']:
+            return
+
+        merged = 0
+        for count in merge_duplicate_authors(chunk_size, refresh=migrated):
+            merged += count
+            self.stdout.write(f'Merged {merged} authors')
+        self.stdout.write(self.style.SUCCESS(f'Removed {merged} duplicate authors'))
+        if merged and not migrated:
+            self.stdout.write(
+                'Unapplied migrations: after migrate, run rebuild_search_index, '
+                'backfill_authors_display and rebuild_facets'
+            )
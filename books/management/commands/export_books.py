@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from books.export import WRITERS, export_books
+from books.filters import ApiBookFilter
+from books.models import Book
+
+
+class Command(BaseCommand):
+    help = 'Stream the book catalogue as NDJSON or CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(WRITERS), default='ndjson')
+        parser.add_argument('--output', help='Output file, stdout by default')
+        parser.add_argument('--chunk-size', type=int)
+        for name in ApiBookFilter.base_filters:
+            parser.add_argument('--' + name.replace('_', '-'), dest=name)
+
+    def handle(self, *args, **options):
+        data = {
+            name: options[name]
+            for name in ApiBookFilter.base_filters
+            if options[name] is not None
+        }
+        filter = ApiBookFilter(data, queryset=Book.objects.all())
+        if not filter.is_valid():
+            raise CommandError(filter.errors.as_text())
+
+        lines = export_books(filter.qs, options['format'], options['chunk_size'])
+        if options['output'] is None:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+
+        with open(options['output'], 'w', newline='') as output:
+            output.writelines(lines)
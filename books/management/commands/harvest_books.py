@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from books import metrics
+from books.functions import get_query
+from books.harvester import import_harvest
+
+
+class Command(BaseCommand):
+    help = 'Import every Google Books volume matching a query'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--key-word', default='')
+        parser.add_argument('--title', default='')
+        parser.add_argument('--author', default='')
+        parser.add_argument('--isbn', default='')
+        parser.add_argument('--workers', type=int)
+        parser.add_argument('--rate-limit', type=float, help='Requests per second')
+        parser.add_argument('--max-items', type=int)
+        parser.add_argument('--refresh', action='store_true', help='Update metadata of books already stored')
+
+    def handle(self, *args, **options):
+        query = get_query(
+            key_word=options['key_word'],
+            title=options['title'],
+            author=options['author'],
+            isbn=options['isbn']
+        )
+        fetched = 0
+
+        def on_page(items, imported_books):
+            nonlocal fetched
+            fetched += items
+            self.stdout.write(f'Fetched {fetched} volumes, imported {imported_books} books')
+
+        imported_books = import_harvest(
+            query,
+            on_page=on_page,
+            refresh=options['refresh'],
+            workers=options['workers'],
+            rate_limit=options['rate_limit'],
+            max_items=options['max_items']
+        )
+        metrics.flush()
+        self.stdout.write(self.style.SUCCESS(f'Imported {imported_books} books'))
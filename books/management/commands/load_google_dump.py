@@ -0,0 +1,103 @@
+import json
+import os
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DataError, IntegrityError, connection
+
+from books import metrics
+from books.dumps import get_format, get_items, iter_records, open_dump
+from books.functions import import_volumes
+from books.parallel import ShardedImporter
+
+
+# Raised by volumes the importer cannot handle, rather than by the database
+# or the environment. Sharded workers report them as RuntimeError.
+VOLUME_ERRORS = (AttributeError, KeyError, TypeError, ValueError, ValidationError, DataError, IntegrityError)
+
+
+class Command(BaseCommand):
+    help = 'Load saved Google Books API responses or volumes from a JSON or NDJSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['json', 'ndjson'], help='Guessed from the file name by default')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Volumes per transaction')
+        parser.add_argument('--checkpoint', help='Progress file, <path>.checkpoint by default')
+        parser.add_argument('--restart', action='store_true', help='Ignore a saved checkpoint')
+        parser.add_argument('--processes', type=int, default=1, help='Import processes, one per ISBN shard')
+        parser.add_argument('--refresh', action='store_true', help='Update metadata of books already stored')
+
+    def load_checkpoint(self, path):
+        progress = {'records': 0, 'volumes': 0, 'imported_books': 0, 'skipped_volumes': 0}
+        if os.path.exists(path):
+            with open(path) as checkpoint:
+                progress.update(json.load(checkpoint))
+        return progress
+
+    def save_checkpoint(self, path, progress):
+        with open(path + '.tmp', 'w') as checkpoint:
+            json.dump(progress, checkpoint)
+        os.replace(path + '.tmp', path)
+
+    def import_each(self, items, refresh):
+        imported_books = skipped = 0
+        for item in items:
+            try:
+                imported_books += import_volumes([item], refresh)
+            except VOLUME_ERRORS as e:
+                skipped += 1
+                self.stderr.write(f'Skipped invalid volume: {e!r}')
+        return imported_books, skipped
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'{path} does not exist')
+        checkpoint_path = options['checkpoint'] or path + '.checkpoint'
+        progress = {'records': 0, 'volumes': 0, 'imported_books': 0, 'skipped_volumes': 0}
+        if not options['restart']:
+            progress = self.load_checkpoint(checkpoint_path)
+            if progress['records']:
+                self.stdout.write(f'Resuming after {progress["records"]} records')
+
+        processes = options['processes']
+        if processes > 1 and connection.vendor == 'sqlite':
+            self.stderr.write('SQLite allows a single writer, importing in one process')
+            processes = 1
+        batch_size = options['batch_size'] * processes
+
+        def flush(items, records):
+            try:
+                progress['imported_books'] += importer.import_volumes(items)
+            except (RuntimeError,) + VOLUME_ERRORS:
+                # Otherwise a bad volume fails its batch again on every resume.
+                imported_books, skipped = self.import_each(items, options['refresh'])
+                progress['imported_books'] += imported_books
+                progress['skipped_volumes'] += skipped
+            progress['volumes'] += len(items)
+            progress['records'] += records
+            self.save_checkpoint(checkpoint_path, progress)
+            self.stdout.write(
+                f'Loaded {progress["volumes"]} volumes, imported {progress["imported_books"]} books, '
+                f'skipped {progress["skipped_volumes"]} invalid volumes'
+            )
+
+        items = []
+        records = 0
+        with open_dump(path) as stream, ShardedImporter(processes, options['refresh']) as importer:
+            format = options['format'] or get_format(path)
+            for record in iter_records(stream, format, skip=progress['records']):
+                items.extend(get_items(record))
+                records += 1
+                if len(items) >= batch_size:
+                    flush(items, records)
+                    items = []
+                    records = 0
+            if records:
+                flush(items, records)
+        metrics.flush()
+
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        self.stdout.write(self.style.SUCCESS(f'Imported {progress["imported_books"]} books'))
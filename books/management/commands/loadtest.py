@@ -0,0 +1,58 @@
+import asyncio
+import statistics
+import time
+
+import httpx
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Send concurrent GET requests to a running server and report latency percentiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('url')
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--timeout', type=float, default=30)
+
+    async def run(self, url, requests, concurrency, timeout):
+        queue = asyncio.Queue()
+        for _ in range(requests):
+            queue.put_nowait(url)
+        latencies = []
+        errors = 0
+
+        async def worker(client):
+            nonlocal errors
+            while not queue.empty():
+                queue.get_nowait()
+                start = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    response.raise_for_status()
+                except httpx.HTTPError:
+                    errors += 1
+                else:
+                    latencies.append(time.perf_counter() - start)
+
+        limits = httpx.Limits(max_connections=concurrency)
+        async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+            await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        return latencies, errors
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        latencies, errors = asyncio.run(self.run(
+            options['url'],
+            options['requests'],
+            options['concurrency'],
+            options['timeout']
+        ))
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(f'Requests: {len(latencies)} ok, {errors} failed in {elapsed:.2f}s')
+        self.stdout.write(f'Throughput: {len(latencies) / elapsed:.1f} req/s')
+        if len(latencies) > 1:
+            percentiles = statistics.quantiles(latencies, n=100)
+            for percentile in (50, 90, 99):
+                self.stdout.write(f'p{percentile}: {percentiles[percentile - 1] * 1000:.1f} ms')
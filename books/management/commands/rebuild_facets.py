@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from books.stats import rebuild_facets
+
+
+class Command(BaseCommand):
+    help = 'Recount the language, year and author facets from scratch'
+
+    def handle(self, *args, **options):
+        count = rebuild_facets()
+        self.stdout.write(self.style.SUCCESS(f'Stored {count} facet counts'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from books import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for books'
+
+    def handle(self, *args, **options):
+        search.index_books()
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt'))
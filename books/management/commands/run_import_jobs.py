@@ -0,0 +1,49 @@
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from books.jobs import work
+
+
+def run_worker(**options):
+    try:
+        work(**options)
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = 'Run queued Google Books import jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--poll-interval', type=float, default=1.0)
+        parser.add_argument('--once', action='store_true', help='Exit when the queue is empty')
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        threads = [
+            threading.Thread(
+                target=run_worker,
+                kwargs={
+                    'poll_interval': options['poll_interval'],
+                    'once': options['once'],
+                    'stop': stop
+                },
+                daemon=True
+            )
+            for _ in range(options['workers'])
+        ]
+        for thread in threads:
+            thread.start()
+        self.stdout.write(f'Started {len(threads)} import workers')
+
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(1)
+        except KeyboardInterrupt:
+            stop.set()
+            for thread in threads:
+                thread.join()
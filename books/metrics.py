@@ -0,0 +1,233 @@
+import bisect
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+registry = []
+
+# Names this process's row of merged snapshots, see flush().
+PROCESS = f'{socket.gethostname()}:{os.getpid()}:{time.time_ns()}'
+
+
+def format_labels(pairs):
+    if not pairs:
+        return ''
+    labels = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n'))
+        for name, value in pairs
+    )
+    return '{' + labels + '}'
+
+
+class Metric:
+    type = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+        registry.append(self)
+
+    def export(self):
+        with self.lock:
+            return [[list(labels), value] for labels, value in self.values.items()]
+
+    def merge(self, values, exported):
+        for labels, value in exported:
+            labels = tuple(labels)
+            values[labels] = values[labels] + value if labels in values else value
+
+    def reset(self):
+        with self.lock:
+            self.values = {}
+
+    def samples(self, values):
+        return []
+
+    def render(self, snapshots=()):
+        values = {}
+        self.merge(values, self.export())
+        for snapshot in snapshots:
+            self.merge(values, snapshot.get(self.name, []))
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type}']
+        for name, pairs, value in self.samples(values):
+            lines.append(f'{name}{format_labels(pairs)} {value}')
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, *labelvalues, amount=1):
+        with self.lock:
+            self.values[labelvalues] = self.values.get(labelvalues, 0) + amount
+
+    def get(self, *labelvalues):
+        return self.values.get(labelvalues, 0)
+
+    def samples(self, values):
+        return [(self.name, list(zip(self.labelnames, labels)), value) for labels, value in sorted(values.items())]
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labelvalues):
+        with self.lock:
+            entry = self.values.setdefault(labelvalues, [[0] * (len(self.buckets) + 1), 0, 0])
+            entry[0][bisect.bisect_left(self.buckets, value)] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, *labelvalues):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labelvalues)
+
+    def get_count(self, *labelvalues):
+        return self.values.get(labelvalues, [None, 0, 0])[2]
+
+    def export(self):
+        with self.lock:
+            return [
+                [list(labels), [list(counts), total, count]]
+                for labels, (counts, total, count) in self.values.items()
+            ]
+
+    def merge(self, values, exported):
+        for labels, (counts, total, count) in exported:
+            labels = tuple(labels)
+            if labels in values:
+                entry = values[labels]
+                values[labels] = [[a + b for a, b in zip(entry[0], counts)], entry[1] + total, entry[2] + count]
+            else:
+                values[labels] = [list(counts), total, count]
+
+    def samples(self, values):
+        samples = []
+        for labels, (counts, total, count) in sorted(values.items()):
+            pairs = list(zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += bucket_count
+                samples.append((self.name + '_bucket', pairs + [('le', bound)], cumulative))
+            samples.append((self.name + '_sum', pairs, total))
+            samples.append((self.name + '_count', pairs, count))
+        return samples
+
+
+class CallbackMetric(Metric):
+
+    def __init__(self, name, documentation, type, labelnames, callback):
+        super().__init__(name, documentation, labelnames)
+        self.type = type
+        self.callback = callback
+
+    def export(self):
+        return [[list(labels), value] for labels, value in self.callback().items()]
+
+    def reset(self):
+        pass
+
+    def samples(self, values):
+        return [(self.name, list(zip(self.labelnames, labels)), value) for labels, value in sorted(values.items())]
+
+
+def get_snapshots():
+    from .models import MetricSnapshot
+
+    # Rows of processes gone this long are dropped.
+    MetricSnapshot.objects.filter(
+        updated_at__lt=timezone.now() - timedelta(seconds=settings.BOOKS_METRICS_RETENTION)
+    ).delete()
+    return MetricSnapshot.objects.exclude(process=PROCESS).values_list('data', flat=True)
+
+
+def render():
+    # Web and import worker processes each keep their own values; every
+    # /metrics response merges them through the database.
+    snapshots = list(get_snapshots())
+    return '\n'.join(metric.render(snapshots) for metric in registry) + '\n'
+
+
+_last_flush = time.monotonic()
+_flush_lock = threading.Lock()
+
+
+def flush():
+    from .models import MetricSnapshot
+
+    global _last_flush
+    if connection.in_atomic_block:
+        # Never inside a caller's transaction, which could roll it back.
+        return
+    with _flush_lock:
+        _last_flush = time.monotonic()
+        data = {metric.name: metric.export() for metric in registry}
+    MetricSnapshot.objects.update_or_create(process=PROCESS, defaults={'data': data})
+
+
+def is_flush_due():
+    return time.monotonic() - _last_flush >= settings.BOOKS_METRICS_FLUSH_INTERVAL
+
+
+def maybe_flush():
+    if is_flush_due():
+        flush()
+
+
+def reset():
+    # Forked workers start from zero rather than report their parent's values.
+    global PROCESS
+    PROCESS = f'{socket.gethostname()}:{os.getpid()}:{time.time_ns()}'
+    for metric in registry:
+        metric.reset()
+
+
+IMPORT_STAGE_SECONDS = Histogram(
+    'books_import_stage_seconds',
+    'Time spent in each stage of a Google Books import',
+    ['stage']
+)
+IMPORT_ITEMS = Counter(
+    'books_import_items_total',
+    'Volumes seen by imports, by outcome',
+    ['result']
+)
+UPSTREAM_REQUEST_SECONDS = Histogram(
+    'books_upstream_request_seconds',
+    'Latency of each upstream HTTP attempt',
+    ['host', 'status']
+)
+REQUEST_SECONDS = Histogram(
+    'books_request_seconds',
+    'Time to build each response, by view',
+    ['view', 'method', 'status']
+)
+REQUEST_QUERIES = Histogram(
+    'books_request_queries',
+    'Database queries run while building each response, by view',
+    ['view'],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200)
+)
@@ -0,0 +1,119 @@
+import asyncio
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import sync_to_async
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from . import metrics
+from .metrics import REQUEST_QUERIES, REQUEST_SECONDS
+
+
+# Queries of the current request, including those run on other threads by
+# sync_to_async, which copies the context.
+request_queries = ContextVar('request_queries', default=None)
+
+
+class QueryCounter:
+
+    def __init__(self):
+        self.count = 0
+
+
+def count_query(execute, sql, params, many, context):
+    counter = request_queries.get()
+    if counter is not None:
+        counter.count += 1
+    return execute(sql, params, many, context)
+
+
+def install_query_counter(connection):
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
+
+
+@receiver(connection_created)
+def connection_opened(sender, connection, **kwargs):
+    install_query_counter(connection)
+
+
+class AsyncCapableMiddleware:
+    # Under ASGI a sync-only middleware makes Django run the whole request
+    # on the single thread-sensitive thread, serializing every request.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # Marks instances as coroutine functions, like Django's MiddlewareMixin.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+
+class MetricsMiddleware(AsyncCapableMiddleware):
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        for connection in connections.all():
+            install_query_counter(connection)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        queries = QueryCounter()
+        token = request_queries.set(queries)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            request_queries.reset(token)
+        self.observe(request, response, start, queries)
+        metrics.maybe_flush()
+        return response
+
+    async def __acall__(self, request):
+        queries = QueryCounter()
+        token = request_queries.set(queries)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_queries.reset(token)
+        self.observe(request, response, start, queries)
+        if metrics.is_flush_due():
+            await sync_to_async(metrics.flush)()
+        return response
+
+    def observe(self, request, response, start, queries):
+        match = request.resolver_match
+        view = match.url_name if match and match.url_name else 'unmatched'
+        REQUEST_SECONDS.observe(time.perf_counter() - start, view, request.method, str(response.status_code))
+        REQUEST_QUERIES.observe(queries.count, view)
+
+
+class StaticFilesMiddleware(AsyncCapableMiddleware, WhiteNoiseMiddleware):
+    # WhiteNoise 5 is sync-only; settings swap it for this class.
+
+    def __init__(self, get_response):
+        AsyncCapableMiddleware.__init__(self, get_response)
+        WhiteNoiseMiddleware.__init__(self, get_response)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            # Looks files up on disk, only in development.
+            response = await sync_to_async(self.process_request, thread_sensitive=False)(request)
+        else:
+            response = self.process_request(request)
+        if response is None:
+            response = await self.get_response(request)
+        return response
@@ -0,0 +1,23 @@
+from django.db import migrations
+
+from books import search
+
+
+def create_search_index(apps, schema_editor):
+    search.create_index(schema_editor)
+    search.index_books()
+
+
+def drop_search_index(apps, schema_editor):
+    search.drop_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0003_book_title_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 3.2.8 on 2026-10-18 18:08
+
+import books.models
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def clear_duplicate_isbns(apps, schema_editor):
+    # Keep the ISBN on one book per value so the unique constraint can be added.
+    Book = apps.get_model('books', 'Book')
+    duplicates = (
+        Book.objects.filter(isbn__isnull=False)
+        .values('isbn')
+        .annotate(count=Count('id'))
+        .filter(count__gt=1)
+        .order_by()
+    )
+    for duplicate in duplicates:
+        ids = list(Book.objects.filter(isbn=duplicate['isbn']).values_list('id', flat=True)[1:])
+        Book.objects.filter(id__in=ids).update(isbn=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0004_book_search'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='author',
+            name='name',
+            field=models.CharField(db_index=True, max_length=200),
+        ),
+        migrations.RunPython(clear_duplicate_isbns, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='book',
+            name='isbn',
+            field=models.PositiveIntegerField(blank=True, null=True, unique=True, validators=[books.models.isbn_validator]),
+        ),
+        migrations.AlterField(
+            model_name='book',
+            name='language',
+            field=models.CharField(blank=True, db_index=True, max_length=20, null=True),
+        ),
+        migrations.AlterField(
+            model_name='book',
+            name='publication_date',
+            field=models.DateField(blank=True, db_index=True, null=True),
+        ),
+    ]
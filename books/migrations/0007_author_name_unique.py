@@ -0,0 +1,49 @@
+# Generated by Django 3.2.8 on 2026-10-18 18:27
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicate_authors(apps, schema_editor):
+    # Point every book at one author per name so the unique constraint can be added.
+    Author = apps.get_model('books', 'Author')
+    BookAuthor = apps.get_model('books', 'Book').author.through
+    duplicates = (
+        Author.objects.values('name')
+        .annotate(count=Count('id'), keep_id=Min('id'))
+        .filter(count__gt=1)
+        .order_by()
+    )
+    for duplicate in duplicates:
+        keep_id = duplicate['keep_id']
+        author_ids = list(
+            Author.objects.filter(name=duplicate['name']).exclude(id=keep_id).values_list('id', flat=True)
+        )
+        rows = BookAuthor.objects.filter(author_id__in=author_ids)
+        rows.filter(book_id__in=BookAuthor.objects.filter(author_id=keep_id).values('book_id')).delete()
+        # A book linked to several of the replaced authors keeps one link.
+        seen = set()
+        repeated = []
+        for row_id, book_id in rows.order_by('id').values_list('id', 'book_id'):
+            if book_id in seen:
+                repeated.append(row_id)
+            seen.add(book_id)
+        BookAuthor.objects.filter(id__in=repeated).delete()
+        rows.update(author_id=keep_id)
+        Author.objects.filter(id__in=author_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0006_book_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_authors, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='author',
+            name='name',
+            field=models.CharField(max_length=200, unique=True),
+        ),
+    ]
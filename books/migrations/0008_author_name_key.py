@@ -0,0 +1,18 @@
+# Generated by Django 3.2.8 on 2026-10-18 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0007_author_name_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='author',
+            name='name_key',
+            field=models.CharField(db_index=True, editable=False, max_length=200, null=True),
+        ),
+    ]
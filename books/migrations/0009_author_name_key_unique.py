@@ -0,0 +1,77 @@
+# Generated by Django 3.2.8 on 2026-10-18 18:40
+
+from django.db import migrations, models, transaction
+from django.db.models import Count, Min, Sum
+
+from books.models import normalize_author_name
+
+
+# Larger backlogs must be cleared beforehand by the resumable
+# dedupe_authors command, run with 0008 applied.
+MAX_UNMERGED_AUTHORS = 10000
+CHUNK_SIZE = 1000
+
+
+def merge_authors_by_key(apps, schema_editor):
+    Author = apps.get_model('books', 'Author')
+    BookAuthor = apps.get_model('books', 'Book').author.through
+
+    unkeyed = Author.objects.filter(name_key__isnull=True)
+    duplicates = (
+        Author.objects.filter(name_key__isnull=False).values('name_key')
+        .annotate(count=Count('id'), keep_id=Min('id'))
+        .filter(count__gt=1)
+        .order_by()
+    )
+    pending = unkeyed.count() + (duplicates.aggregate(authors=Sum('count'))['authors'] or 0)
+    if pending > MAX_UNMERGED_AUTHORS:
+        raise RuntimeError(
+            f'{pending} authors need a name key or a merge. Run "manage.py dedupe_authors" '
+            'with migrations up to 0008 applied, then migrate again.'
+        )
+
+    while True:
+        with transaction.atomic():
+            authors = list(unkeyed.only('name').order_by('id')[:CHUNK_SIZE])
+            for author in authors:
+                author.name_key = normalize_author_name(author.name)
+            Author.objects.bulk_update(authors, ['name_key'])
+        if not authors:
+            break
+
+    for duplicate in list(duplicates):
+        with transaction.atomic():
+            merge_duplicate(Author, BookAuthor, duplicate['name_key'], duplicate['keep_id'])
+
+
+def merge_duplicate(Author, BookAuthor, name_key, keep_id):
+    author_ids = list(Author.objects.filter(name_key=name_key).exclude(id=keep_id).values_list('id', flat=True))
+    rows = BookAuthor.objects.filter(author_id__in=author_ids)
+    rows.filter(book_id__in=BookAuthor.objects.filter(author_id=keep_id).values('book_id')).delete()
+    seen = set()
+    repeated = []
+    for row_id, book_id in rows.values_list('id', 'book_id'):
+        if book_id in seen:
+            repeated.append(row_id)
+        seen.add(book_id)
+    BookAuthor.objects.filter(id__in=repeated).delete()
+    rows.update(author_id=keep_id)
+    Author.objects.filter(id__in=author_ids).delete()
+
+
+class Migration(migrations.Migration):
+    # Keys are filled and merged in chunks, each in its own transaction.
+    atomic = False
+
+    dependencies = [
+        ('books', '0008_author_name_key'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_authors_by_key, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='author',
+            name='name_key',
+            field=models.CharField(editable=False, max_length=200, unique=True),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 3.2.8 on 2026-10-18 20:15
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+from books.models import AUTHORS_SEPARATOR
+
+
+def fill_authors_display(apps, schema_editor):
+    # Large catalogues can skip this by running the resumable
+    # backfill_authors_display command right after the AddField.
+    Book = apps.get_model('books', 'Book')
+    BookAuthor = Book.author.through
+
+    authors = defaultdict(list)
+    rows = BookAuthor.objects.order_by('id').values_list('book_id', 'author__name')
+    for book_id, name in rows.iterator():
+        authors[book_id].append(name)
+
+    books = []
+    for book in Book.objects.filter(id__in=authors.keys()).only('id').iterator():
+        book.authors_display = AUTHORS_SEPARATOR.join(authors[book.id])
+        books.append(book)
+    Book.objects.bulk_update(books, ['authors_display'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0009_author_name_key_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='authors_display',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(fill_authors_display, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 3.2.8 on 2026-10-18 18:41
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import ExtractYear
+
+
+def count_facets(apps, schema_editor):
+    Author = apps.get_model('books', 'Author')
+    Book = apps.get_model('books', 'Book')
+    FacetCount = apps.get_model('books', 'FacetCount')
+
+    languages = Book.objects.exclude(language__isnull=True).exclude(language='').values_list('language')
+    years = Book.objects.exclude(publication_date__isnull=True).values_list(ExtractYear('publication_date'))
+    authors = Author.objects.values_list('name').annotate(count=Count('book')).filter(count__gt=0)
+    FacetCount.objects.bulk_create(
+        [FacetCount(facet='language', value=value, count=count)
+         for value, count in languages.annotate(count=Count('id')).order_by()]
+        + [FacetCount(facet='year', value=str(value), count=count)
+           for value, count in years.annotate(count=Count('id')).order_by()]
+        + [FacetCount(facet='author', value=value, count=count) for value, count in authors.order_by()],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0010_book_authors_display'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(choices=[('language', 'Language'), ('year', 'Publication year'), ('author', 'Author')], max_length=20)),
+                ('value', models.CharField(max_length=200)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='facetcount',
+            index=models.Index(fields=['facet', '-count', 'value'], name='facet_count_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='facetcount',
+            constraint=models.UniqueConstraint(fields=('facet', 'value'), name='facet_value_unique'),
+        ),
+        migrations.RunPython(count_facets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.8 on 2026-10-18 19:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0014_metricsnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='catalogueversion',
+            name='updated_at',
+            field=models.DateTimeField(null=True),
+        ),
+    ]
@@ -1,4 +1,6 @@
+import unicodedata
 import uuid
+from collections import defaultdict
 
 from django.db import models
 from django.contrib.auth.models import AbstractUser
@@ -15,27 +17,153 @@ def isbn_validator(value):
         )
 
 
+AUTHORS_SEPARATOR = '; '
+
+
+def normalize_author_name(name):
+    # Names differing only in case, spacing or Unicode form are one author.
+    return ' '.join(unicodedata.normalize('NFKC', name).split()).casefold()
+
+
 class User(AbstractUser):
     pass
 
 
+class AuthorQuerySet(models.QuerySet):
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for author in objs:
+            author.name_key = normalize_author_name(author.name)
+        return super().bulk_create(objs, *args, **kwargs)
+
+
 class Author(models.Model):
-    name = models.CharField(max_length=200)
+    name = models.CharField(max_length=200, unique=True)
+    name_key = models.CharField(max_length=200, unique=True, editable=False)
+
+    objects = AuthorQuerySet.as_manager()
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.name_key = normalize_author_name(self.name)
+        super().save(*args, **kwargs)
+
 
 class Book(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     title = models.CharField(max_length=200)
     author = models.ManyToManyField(Author)
-    publication_date = models.DateField(null=True, blank=True)
-    isbn = models.PositiveIntegerField(null=True, blank=True, validators=[isbn_validator])
+    publication_date = models.DateField(null=True, blank=True, db_index=True)
+    isbn = models.PositiveIntegerField(null=True, blank=True, unique=True, validators=[isbn_validator])
     pages = models.PositiveIntegerField(null=True, blank=True)
     image_url = models.URLField(max_length=1000, null=True, blank=True)
-    language = models.CharField(max_length=20, null=True, blank=True)
+    language = models.CharField(max_length=20, null=True, blank=True, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    # Author names in link order, kept in sync by books.signals.authors_changed.
+    authors_display = models.TextField(blank=True, default='', editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['title', 'id'], name='book_title_id_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+    @property
+    def authors_list(self):
+        return self.authors_display.split(AUTHORS_SEPARATOR) if self.authors_display else []
+
+
+def get_authors_display(book_ids):
+    authors = defaultdict(list)
+    rows = (
+        Book.author.through.objects.filter(book_id__in=book_ids)
+        .order_by('id')
+        .values_list('book_id', 'author__name')
+    )
+    for book_id, name in rows:
+        authors[book_id].append(name)
+    return {book_id: AUTHORS_SEPARATOR.join(names) for book_id, names in authors.items()}
+
+
+class ImportJob(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+        (CANCELLED, 'Cancelled'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    query = models.CharField(max_length=1000)
+    max_items = models.PositiveIntegerField(null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    cancel_requested = models.BooleanField(default=False)
+    fetched_items = models.PositiveIntegerField(default=0)
+    imported_books = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+
+    def __str__(self):
+        return f'{self.query} ({self.status})'
+
+    @property
+    def is_finished(self):
+        return self.status in (self.DONE, self.FAILED, self.CANCELLED)
+
+
+class CatalogueVersion(models.Model):
+    # A single row, bumped after every committed catalogue write. It lives
+    # in the database so web and import worker processes share it.
+    version = models.PositiveBigIntegerField(default=0)
+    # Unlike the books' updated_at, this also moves when books are deleted.
+    updated_at = models.DateTimeField(null=True)
+
+
+class MetricSnapshot(models.Model):
+    # The metric values of one web or worker process, merged by /metrics.
+    process = models.CharField(max_length=200, unique=True)
+    data = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+
+class FacetCount(models.Model):
+    LANGUAGE = 'language'
+    YEAR = 'year'
+    AUTHOR = 'author'
+    FACET_CHOICES = [
+        (LANGUAGE, 'Language'),
+        (YEAR, 'Publication year'),
+        (AUTHOR, 'Author'),
+    ]
+
+    facet = models.CharField(max_length=20, choices=FACET_CHOICES)
+    value = models.CharField(max_length=200)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['facet', 'value'], name='facet_value_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['facet', '-count', 'value'], name='facet_count_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.facet}={self.value} ({self.count})'
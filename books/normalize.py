@@ -0,0 +1,79 @@
+import datetime
+import re
+from collections import namedtuple
+
+
+# YYYY, YYYY-MM or YYYY-MM-DD, possibly followed by a time.
+DATE_RE = re.compile(r'(\d{4})(?:-(\d{2})(?:-(\d{2}))?)?(?:$|T)')
+
+ISBN_RANKS = {'ISBN_13': 2, 'ISBN_10': 1}
+
+
+def get_date(date):
+    match = DATE_RE.match(date) if isinstance(date, str) else None
+    if match is None:
+        return None
+    year, month, day = (int(part) if part else 1 for part in match.groups())
+    try:
+        return datetime.date(year, month, day)
+    except ValueError:
+        return None
+
+
+def get_pages(pages):
+    if isinstance(pages, int) and not isinstance(pages, bool) and pages >= 0:
+        return pages
+    return None
+
+
+def get_isbn(identifiers):
+    rank = 0
+    identifier = ''
+    for id in identifiers:
+        id_rank = ISBN_RANKS.get(id['type'], 0)
+        if id_rank > rank:
+            rank = id_rank
+            identifier = id['identifier']
+    try:
+        return int(identifier)
+    except ValueError:
+        return None
+
+
+def get_image_url(links):
+    return links.get('thumbnail', links.get('smallThumbnail'))
+
+
+def get_authors(authors):
+    return tuple(dict.fromkeys(authors))
+
+
+# (row field, volumeInfo key, converter, default when the key is missing)
+FIELDS = (
+    ('isbn', 'industryIdentifiers', get_isbn, None),
+    ('title', 'title', None, None),
+    ('publication_date', 'publishedDate', get_date, None),
+    ('pages', 'pageCount', get_pages, None),
+    ('image_url', 'imageLinks', get_image_url, None),
+    ('language', 'language', None, None),
+    ('authors', 'authors', get_authors, ()),
+)
+
+VolumeRow = namedtuple('VolumeRow', [field for field, _, _, _ in FIELDS])
+
+
+def get_column(infos, key, convert, default):
+    if convert is None:
+        return [info.get(key, default) for info in infos]
+    return [convert(info[key]) if key in info else default for info in infos]
+
+
+def normalize_volumes(items):
+    infos = [item['volumeInfo'] for item in items]
+    columns = [get_column(infos, key, convert, default) for _, key, convert, default in FIELDS]
+    rows = {}
+    for row in zip(*columns):
+        isbn = row[0]
+        if isbn not in rows and isbn is not None and row[1] is not None:
+            rows[isbn] = VolumeRow._make(row)
+    return rows
@@ -0,0 +1,140 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+
+class KeysetPagination(BasePagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    ordering = ('title', 'id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def encode_cursor(self, reverse, position):
+        data = json.dumps([reverse, position], separators=(',', ':'))
+        cursor = base64.urlsafe_b64encode(data.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def get_ordering(self, queryset):
+        # Ranked search results page in rank order, everything else by title.
+        order_by = queryset.query.order_by
+        if order_by and order_by[0].lstrip('-') == 'search_rank':
+            return (order_by[0], 'id')
+        return self.ordering
+
+    def get_ordering_field(self, queryset, name):
+        name = name.lstrip('-')
+        if name in queryset.query.annotations:
+            return queryset.query.annotations[name].output_field
+        return queryset.model._meta.get_field(name)
+
+    def decode_cursor(self, request, queryset):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor is None:
+            return False, None
+        try:
+            reverse, position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if not isinstance(position, list) or len(position) != len(self.current_ordering):
+                raise ValueError
+            # Cursors come from clients, so check every value before the query.
+            values = []
+            for name, value in zip(self.current_ordering, position):
+                if value is None:
+                    raise ValueError
+                values.append(self.get_ordering_field(queryset, name).to_python(value))
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return bool(reverse), values
+
+    def get_position(self, obj):
+        position = []
+        for field in self.current_ordering:
+            value = getattr(obj, field.lstrip('-'))
+            position.append(value if isinstance(value, float) else str(value))
+        return position
+
+    def get_keyset_filter(self, position, reverse, ordering=None):
+        # Row comparison (a, b) > (x, y), with a leading range on the first
+        # field so the composite index can be scanned from the cursor onwards.
+        def get_lookup(field):
+            descending = field.startswith('-')
+            return field.lstrip('-'), 'lt' if descending != reverse else 'gt'
+
+        ordering = ordering or self.ordering
+        fields = [(*get_lookup(field), value) for field, value in zip(ordering, position)]
+        last_field, last_lookup, last_value = fields[-1]
+        keyset = Q(**{f'{last_field}__{last_lookup}': last_value})
+        for field, lookup, value in reversed(fields[:-1]):
+            keyset = Q(**{f'{field}__{lookup}': value}) | (Q(**{field: value}) & keyset)
+        first_field, first_lookup, first_value = fields[0]
+        return Q(**{f'{first_field}__{first_lookup}e': first_value}) & keyset
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        self.current_ordering = self.get_ordering(queryset)
+        page_size = self.get_page_size(request)
+        reverse, position = self.decode_cursor(request, queryset)
+
+        if reverse:
+            queryset = queryset.order_by(*(
+                field[1:] if field.startswith('-') else f'-{field}' for field in self.current_ordering
+            ))
+        else:
+            queryset = queryset.order_by(*self.current_ordering)
+        if position is not None:
+            queryset = queryset.filter(self.get_keyset_filter(position, reverse, self.current_ordering))
+
+        results = list(queryset[:page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if reverse:
+            results.reverse()
+
+        self.has_next = has_more if not reverse else position is not None
+        self.has_previous = position is not None if not reverse else has_more
+        self.first_position = self.get_position(results[0]) if results else position
+        self.last_position = self.get_position(results[-1]) if results else position
+        return results
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(False, self.last_position)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.first_position is None:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(True, self.first_position)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,107 @@
+import multiprocessing
+import queue
+import traceback
+import zlib
+
+from django.db import connections
+
+from . import metrics
+from .functions import import_volumes
+from .normalize import get_isbn
+
+
+# How often a parent waiting for results checks that its workers are alive.
+POLL_INTERVAL = 1
+
+
+class WorkerDied(Exception):
+    # Not a RuntimeError, which callers treat as a bad batch.
+    pass
+
+
+def get_shard(isbn, shards):
+    return zlib.crc32(str(isbn).encode()) % shards
+
+
+def shard_volumes(items, shards):
+    batches = [[] for _ in range(shards)]
+    for item in items:
+        isbn = get_isbn(item['volumeInfo'].get('industryIdentifiers', ()))
+        if isbn is not None:
+            batches[get_shard(isbn, shards)].append(item)
+    return batches
+
+
+def import_worker(tasks, results, refresh):
+    metrics.reset()
+    try:
+        for items in iter(tasks.get, None):
+            try:
+                results.put((import_volumes(items, refresh), None))
+            except Exception:
+                results.put((0, traceback.format_exc()))
+            metrics.maybe_flush()
+    finally:
+        metrics.flush()
+        connections.close_all()
+
+
+class ShardedImporter:
+
+    def __init__(self, processes, refresh=False):
+        self.processes = processes
+        self.refresh = refresh
+        self.tasks = []
+        self.workers = []
+
+    def __enter__(self):
+        if self.processes > 1:
+            context = multiprocessing.get_context('fork')
+            # Forked workers must open their own connections.
+            connections.close_all()
+            self.results = context.Queue()
+            self.tasks = [context.Queue() for _ in range(self.processes)]
+            self.workers = [
+                context.Process(target=import_worker, args=(tasks, self.results, self.refresh), daemon=True)
+                for tasks in self.tasks
+            ]
+            for worker in self.workers:
+                worker.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        for tasks in self.tasks:
+            tasks.put(None)
+        for worker in self.workers:
+            worker.join()
+
+    def get_result(self):
+        # A killed worker never answers, so don't wait for it forever.
+        while True:
+            try:
+                return self.results.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                for worker in self.workers:
+                    if worker.exitcode is not None:
+                        raise WorkerDied(f'Import worker {worker.pid} exited with code {worker.exitcode}')
+
+    def import_volumes(self, items):
+        if not self.workers:
+            return import_volumes(items, self.refresh)
+
+        pending = 0
+        for tasks, batch in zip(self.tasks, shard_volumes(items, self.processes)):
+            if batch:
+                tasks.put(batch)
+                pending += 1
+
+        imported_books = 0
+        errors = []
+        for _ in range(pending):
+            count, error = self.get_result()
+            imported_books += count
+            if error:
+                errors.append(error)
+        if errors:
+            raise RuntimeError('Import worker failed:\n' + '\n'.join(errors))
+        return imported_books
@@ -0,0 +1,166 @@
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+
+from .models import Book, Author
+
+
+SEARCH_TABLE = 'books_book_search'
+BOOK_TABLE = Book._meta.db_table
+
+SQLITE_CREATE = f'''
+CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+    book_id UNINDEXED,
+    title,
+    authors,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+)
+'''
+
+POSTGRESQL_CREATE = [
+    f'''
+    CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} (
+        book_id uuid PRIMARY KEY REFERENCES {BOOK_TABLE} (id) ON DELETE CASCADE,
+        document tsvector NOT NULL
+    )
+    ''',
+    f'CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_document ON {SEARCH_TABLE} USING GIN (document)',
+]
+
+AUTHOR_NAMES = (
+    'SELECT {aggregate} FROM %s ba JOIN %s a ON a.id = ba.author_id WHERE ba.book_id = b.id'
+    % (Book.author.through._meta.db_table, Author._meta.db_table)
+)
+
+SQLITE_INDEX = f'''
+INSERT INTO {SEARCH_TABLE} (book_id, title, authors)
+SELECT b.id, b.title, COALESCE(({AUTHOR_NAMES.format(aggregate="group_concat(a.name, ' ')")}), '')
+FROM {BOOK_TABLE} b
+'''
+
+POSTGRESQL_INDEX = f'''
+INSERT INTO {SEARCH_TABLE} (book_id, document)
+SELECT b.id,
+    setweight(to_tsvector('simple', b.title), 'A') ||
+    setweight(to_tsvector('simple', COALESCE(({AUTHOR_NAMES.format(aggregate="string_agg(a.name, ' ')")}), '')), 'B')
+FROM {BOOK_TABLE} b
+'''
+
+POSTGRESQL_UPSERT = ' ON CONFLICT (book_id) DO UPDATE SET document = EXCLUDED.document'
+
+
+def is_supported(connection=connection):
+    return connection.vendor in ('sqlite', 'postgresql')
+
+
+def create_index(schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(SQLITE_CREATE)
+    elif vendor == 'postgresql':
+        for sql in POSTGRESQL_CREATE:
+            schema_editor.execute(sql)
+
+
+def drop_index(schema_editor):
+    if is_supported(schema_editor.connection):
+        schema_editor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+def get_db_ids(book_ids):
+    pk = Book._meta.pk
+    return [pk.get_db_prep_value(book_id, connection) for book_id in book_ids]
+
+
+def remove_books(book_ids):
+    book_ids = get_db_ids(book_ids)
+    if not book_ids or not is_supported():
+        return
+    placeholders = ', '.join(['%s'] * len(book_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE book_id IN ({placeholders})', book_ids)
+
+
+def index_books(book_ids=None):
+    if not is_supported():
+        return
+
+    if connection.vendor == 'sqlite':
+        sql = SQLITE_INDEX
+        if book_ids is None:
+            with connection.cursor() as cursor:
+                cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        else:
+            remove_books(book_ids)
+    else:
+        sql = POSTGRESQL_INDEX
+
+    params = []
+    if book_ids is None:
+        # An explicit WHERE keeps INSERT ... SELECT ... ON CONFLICT unambiguous.
+        sql += ' WHERE true'
+    else:
+        params = get_db_ids(book_ids)
+        if not params:
+            return
+        sql += ' WHERE b.id IN (%s)' % ', '.join(['%s'] * len(params))
+    if connection.vendor == 'postgresql':
+        sql += POSTGRESQL_UPSERT
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def get_terms(q):
+    return re.findall(r'\w+', q.lower())
+
+
+def search_books(queryset, q):
+    terms = get_terms(q)
+    if not terms:
+        return queryset
+
+    if connection.vendor == 'sqlite':
+        match = ' '.join(f'"{term}"*' for term in terms)
+        # An annotation rather than an extra select, so keyset pagination
+        # can filter on the rank.
+        return queryset.extra(
+            tables=[SEARCH_TABLE],
+            where=[f'{SEARCH_TABLE}.book_id = {BOOK_TABLE}.id', f'{SEARCH_TABLE} MATCH %s'],
+            params=[match]
+        ).annotate(
+            search_rank=RawSQL(f'bm25({SEARCH_TABLE}, 0, 10.0, 5.0)', [], output_field=FloatField())
+        ).order_by('search_rank', 'id')
+
+    if connection.vendor == 'postgresql':
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        return queryset.extra(
+            tables=[SEARCH_TABLE],
+            where=[
+                f'{SEARCH_TABLE}.book_id = {BOOK_TABLE}.id',
+                f"{SEARCH_TABLE}.document @@ to_tsquery('simple', %s)"
+            ],
+            params=[tsquery]
+        ).annotate(
+            search_rank=RawSQL(
+                f"ts_rank({SEARCH_TABLE}.document, to_tsquery('simple', %s))",
+                [tsquery],
+                output_field=FloatField()
+            )
+        ).order_by('-search_rank', 'id')
+
+    condition = Q()
+    for term in terms:
+        condition &= Q(title__icontains=term) | Q(author__name__icontains=term)
+    return queryset.filter(condition).distinct()
+
+
+def search_authors(prefix):
+    if connection.vendor == 'sqlite':
+        # SQLite's LIKE is case-insensitive and cannot use the name index,
+        # a range over the BINARY collation can.
+        return Author.objects.filter(name__gte=prefix, name__lt=prefix + '\U0010ffff')
+    return Author.objects.filter(name__startswith=prefix)
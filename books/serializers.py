@@ -3,7 +3,13 @@ from rest_framework import serializers
 from .models import Book
 
 
+def embeds_authors(request):
+    return request is not None and 'authors' in request.query_params.getlist(BookSerializer.embed_query_param)
+
+
 class BookSerializer(serializers.ModelSerializer):
+    embed_query_param = 'embed'
+
     class Meta:
         model = Book
         fields = [
@@ -14,4 +20,14 @@ class BookSerializer(serializers.ModelSerializer):
             'pages',
             'image_url',
             'language'
-        ]
\ No newline at end of file
+        ]
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if embeds_authors(self.context.get('request')):
+            fields['author'] = serializers.ListField(
+                child=serializers.CharField(),
+                source='authors_list',
+                read_only=True
+            )
+        return fields
@@ -0,0 +1,127 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import search, stats
+from .cache import bump_catalogue_version
+from .models import Book, Author, get_authors_display
+
+
+@receiver(post_save, sender=Book)
+def index_book(sender, instance, **kwargs):
+    search.index_books([instance.pk])
+
+
+@receiver(post_delete, sender=Book)
+def unindex_book(sender, instance, **kwargs):
+    search.remove_books([instance.pk])
+
+
+def authors_changed(book_ids):
+    # Author data is part of every rendered book, so touch the books too.
+    book_ids = list(book_ids)
+    now = timezone.now()
+    authors_display = get_authors_display(book_ids)
+    Book.objects.bulk_update(
+        [Book(pk=pk, authors_display=authors_display.get(pk, ''), updated_at=now) for pk in book_ids],
+        ['authors_display', 'updated_at']
+    )
+    search.index_books(book_ids)
+
+
+@receiver(m2m_changed, sender=Book.author.through)
+def book_authors_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        instance._cleared_book_ids = list(instance.book_set.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        if not reverse:
+            book_ids = [instance.pk]
+        elif action == 'post_clear':
+            book_ids = instance.__dict__.pop('_cleared_book_ids', [])
+        else:
+            book_ids = pk_set
+        authors_changed(book_ids)
+
+
+@receiver(post_save, sender=Author)
+def author_saved(sender, instance, created, **kwargs):
+    if not created:
+        authors_changed(instance.book_set.values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=Author)
+def collect_author_books(sender, instance, **kwargs):
+    instance._deleted_book_ids = list(instance.book_set.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Author)
+def author_deleted(sender, instance, **kwargs):
+    authors_changed(instance.__dict__.pop('_deleted_book_ids', []))
+
+
+@receiver(pre_save, sender=Book)
+def collect_book_facets(sender, instance, **kwargs):
+    if not instance._state.adding:
+        stored = Book.objects.filter(pk=instance.pk).values_list('language', 'publication_date')
+        instance._stored_facets = stored.first()
+
+
+@receiver(post_save, sender=Book)
+def count_saved_book(sender, instance, created, **kwargs):
+    stored = instance.__dict__.pop('_stored_facets', None)
+    stats.count_books(added=[(instance.language, instance.publication_date)], removed=[stored] if stored else [])
+
+
+@receiver(pre_delete, sender=Book)
+def collect_book_authors(sender, instance, **kwargs):
+    # Links go with the book without an m2m_changed signal.
+    instance._deleted_author_ids = list(instance.author.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Book)
+def count_deleted_book(sender, instance, **kwargs):
+    stats.count_books(removed=[(instance.language, instance.publication_date)])
+    stats.count_authors(instance.__dict__.pop('_deleted_author_ids', []))
+
+
+@receiver(m2m_changed, sender=Book.author.through)
+def count_book_authors(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            stats.count_authors([instance.pk])
+    elif action == 'pre_clear':
+        instance._cleared_author_ids = list(instance.author.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        stats.count_authors(instance.__dict__.pop('_cleared_author_ids', []))
+    elif action in ('post_add', 'post_remove'):
+        stats.count_authors(pk_set)
+
+
+@receiver(pre_save, sender=Author)
+def collect_author_name(sender, instance, **kwargs):
+    if not instance._state.adding:
+        instance._stored_name = Author.objects.filter(pk=instance.pk).values_list('name', flat=True).first()
+
+
+@receiver(post_save, sender=Author)
+def count_renamed_author(sender, instance, created, **kwargs):
+    stored_name = instance.__dict__.pop('_stored_name', None)
+    if stored_name is not None and stored_name != instance.name:
+        stats.remove_authors([stored_name])
+        stats.count_authors([instance.pk])
+
+
+@receiver(post_delete, sender=Author)
+def uncount_author(sender, instance, **kwargs):
+    stats.remove_authors([instance.name])
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Author)
+@receiver(m2m_changed, sender=Book.author.through)
+def invalidate_catalogue(sender, **kwargs):
+    if kwargs.get('action', 'post_').startswith('post_'):
+        transaction.on_commit(bump_catalogue_version)
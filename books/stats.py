@@ -0,0 +1,118 @@
+from collections import Counter, defaultdict
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Value, When
+from django.db.models.functions import ExtractYear
+
+from .models import Author, Book, FacetCount
+
+
+def get_book_facets(language, publication_date):
+    publication_date = Book._meta.get_field('publication_date').to_python(publication_date)
+    facets = []
+    if language:
+        facets.append((FacetCount.LANGUAGE, language))
+    if publication_date:
+        facets.append((FacetCount.YEAR, str(publication_date.year)))
+    return facets
+
+
+def get_keys_filter(keys):
+    return reduce(or_, [Q(facet=facet, value=value) for facet, value in keys])
+
+
+def add_counts(deltas):
+    # Rows are inserted and locked in key order, so concurrent writers
+    # queue up behind each other instead of deadlocking.
+    keys = sorted(key for key, amount in deltas.items() if amount)
+    if not keys:
+        return
+    with transaction.atomic(savepoint=False):
+        FacetCount.objects.bulk_create(
+            [FacetCount(facet=facet, value=value) for facet, value in keys],
+            ignore_conflicts=True
+        )
+        locked = FacetCount.objects.select_for_update().filter(get_keys_filter(keys)).order_by('facet', 'value')
+        list(locked.values_list('id'))
+        amounts = defaultdict(list)
+        for key in keys:
+            amounts[deltas[key]].append(key)
+        for amount, rows in amounts.items():
+            FacetCount.objects.filter(get_keys_filter(rows)).update(count=F('count') + amount)
+        removed = [key for key in keys if deltas[key] < 0]
+        if removed:
+            FacetCount.objects.filter(get_keys_filter(removed), count__lte=0).delete()
+
+
+def count_books(added=(), removed=()):
+    # Both take (language, publication_date) pairs.
+    deltas = Counter()
+    for values in added:
+        deltas.update(get_book_facets(*values))
+    for values in removed:
+        deltas.subtract(get_book_facets(*values))
+    add_counts(deltas)
+
+
+def count_authors(author_ids):
+    # Recounted rather than adjusted, so repeated or missing links cannot skew them.
+    author_ids = sorted(set(author_ids))
+    if not author_ids:
+        return
+    with transaction.atomic(savepoint=False):
+        # One recount per author at a time, the last one seeing every
+        # committed link. The no-key lock does not block adding links.
+        list(Author.objects.select_for_update(no_key=True).filter(id__in=author_ids).order_by('id').values_list('id'))
+        counts = Author.objects.filter(id__in=author_ids).annotate(count=Count('book')).values_list('name', 'count')
+        counts = dict(counts)
+        names = sorted(name for name, count in counts.items() if count)
+        FacetCount.objects.bulk_create(
+            [FacetCount(facet=FacetCount.AUTHOR, value=name) for name in names],
+            ignore_conflicts=True
+        )
+        if names:
+            FacetCount.objects.filter(facet=FacetCount.AUTHOR, value__in=names).update(
+                count=Case(*[When(value=name, then=Value(counts[name])) for name in names])
+            )
+        unused = [name for name, count in counts.items() if not count]
+        if unused:
+            FacetCount.objects.filter(facet=FacetCount.AUTHOR, value__in=unused).delete()
+
+
+def remove_authors(names):
+    FacetCount.objects.filter(facet=FacetCount.AUTHOR, value__in=list(names)).delete()
+
+
+def rebuild_facets():
+    languages = (
+        Book.objects.exclude(language__isnull=True).exclude(language='')
+        .values_list('language').annotate(count=Count('id')).order_by()
+    )
+    years = (
+        Book.objects.exclude(publication_date__isnull=True)
+        .annotate(year=ExtractYear('publication_date'))
+        .values_list('year').annotate(count=Count('id')).order_by()
+    )
+    authors = Author.objects.values_list('name').annotate(count=Count('book')).filter(count__gt=0).order_by()
+    with transaction.atomic(savepoint=False):
+        FacetCount.objects.all().delete()
+        FacetCount.objects.bulk_create(
+            [FacetCount(facet=FacetCount.LANGUAGE, value=value, count=count) for value, count in languages]
+            + [FacetCount(facet=FacetCount.YEAR, value=str(value), count=count) for value, count in years]
+            + [FacetCount(facet=FacetCount.AUTHOR, value=value, count=count) for value, count in authors],
+            batch_size=1000
+        )
+    return FacetCount.objects.count()
+
+
+def get_facets(limit=None):
+    limit = limit or settings.BOOKS_FACET_LIMIT
+    return {
+        facet: list(
+            FacetCount.objects.filter(facet=facet).order_by('-count', 'value').values('value', 'count')[:limit]
+        )
+        for facet, _ in FacetCount.FACET_CHOICES
+    }
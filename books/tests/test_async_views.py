@@ -0,0 +1,64 @@
+import asyncio
+import time
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, TransactionTestCase, override_settings
+from django.urls import path
+
+from books import async_views
+from books.models import Author, Book, ImportJob
+
+
+urlpatterns = [path('api/', async_views.book_list)]
+
+
+@override_settings(BOOKS_PAGE_CACHE_TIMEOUT=0)
+class TestAsyncViews(TransactionTestCase):
+    # The API view runs on pool threads with their own connections, which
+    # only see committed data.
+
+    def setUp(self):
+        author = Author.objects.create(name='Author')
+        book = Book.objects.create(title='Title', isbn='9780000000000')
+        book.author.add(author)
+        self.factory = AsyncRequestFactory()
+
+    async def test_book_list(self):
+        response = await async_views.book_list(self.factory.get('/api/'))
+        response.render()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 1)
+
+    async def test_book_import_form(self):
+        response = await async_views.book_import(self.factory.get('/books/import/'))
+        self.assertEqual(response.status_code, 200)
+
+    async def test_book_import_queues_job(self):
+        request = self.factory.post(
+            '/books/import/', 'key_word=Potter', content_type='application/x-www-form-urlencoded'
+        )
+        response = await async_views.book_import(request)
+        job = await sync_to_async(ImportJob.objects.get)()
+        self.assertEqual(job.status, ImportJob.PENDING)
+        self.assertIn('Potter', job.query)
+        self.assertRedirects(response, f'/books/import/{job.pk}/', fetch_redirect_response=False)
+        self.assertEqual(await sync_to_async(Book.objects.count)(), 1)
+
+
+@override_settings(ROOT_URLCONF='books.tests.test_async_views')
+class TestAsyncMiddleware(TransactionTestCase):
+    # Any sync-only middleware would run every request on one shared thread.
+
+    async def test_requests_served_concurrently(self):
+        def slow_view(request):
+            time.sleep(0.5)
+            return HttpResponse('ok')
+
+        with mock.patch.object(async_views, 'book_list_view', slow_view):
+            start = time.monotonic()
+            responses = await asyncio.gather(*[self.async_client.get('/api/') for _ in range(4)])
+            elapsed = time.monotonic() - start
+        self.assertEqual([response.status_code for response in responses], [200] * 4)
+        self.assertLess(elapsed, 1.5)
@@ -0,0 +1,136 @@
+import io
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+
+from books.forms import AuthorForm
+from books.functions import import_volumes, resolve_authors
+from books.models import Author, Book, FacetCount, normalize_author_name
+from books.tests.utils import volume
+
+
+class TestNormalizeAuthorName(SimpleTestCase):
+
+    def test_case_and_spacing(self):
+        self.assertEqual(normalize_author_name('  J. K.   ROWLING\t'), 'j. k. rowling')
+
+    def test_unicode_forms(self):
+        self.assertEqual(normalize_author_name('Gabriel García'), normalize_author_name('Gabriel García'))
+        self.assertEqual(normalize_author_name('STRASSE'), normalize_author_name('Straße'))
+
+
+class TestAuthorKeys(TestCase):
+
+    def test_saved_with_key(self):
+        self.assertEqual(Author.objects.create(name='Dan  Brown').name_key, 'dan brown')
+        author, = Author.objects.bulk_create([Author(name='J. K. ROWLING')])
+        self.assertEqual(author.name_key, 'j. k. rowling')
+
+    def test_resolve_authors_by_key(self):
+        author = Author.objects.create(name='Dan Brown')
+        with self.assertNumQueries(1):
+            authors = resolve_authors(['dan brown', 'DAN  BROWN'])
+        self.assertEqual(authors, {'dan brown': author.pk, 'DAN  BROWN': author.pk})
+
+    def test_import_reuses_author_variants(self):
+        import_volumes([
+            volume(9780000000001, authors=['Dan Brown']),
+            volume(9780000000002, authors=['dan brown', 'DAN BROWN ']),
+        ])
+        self.assertEqual(list(Author.objects.values_list('name', flat=True)), ['Dan Brown'])
+
+    def test_form_rejects_variant(self):
+        Author.objects.create(name='Dan Brown')
+        form = AuthorForm(data={'name': 'DAN BROWN'})
+        self.assertFalse(form.is_valid())
+        self.assertIn('name', form.errors)
+
+
+class TestDedupeAuthorsCommand(TestCase):
+
+    def test_nothing_to_merge(self):
+        Author.objects.create(name='Dan Brown')
+        out = io.StringIO()
+        call_command('dedupe_authors', stdout=out)
+        self.assertIn('Removed 0 duplicate authors', out.getvalue())
+
+    def test_dry_run(self):
+        out = io.StringIO()
+        call_command('dedupe_authors', dry_run=True, stdout=out)
+        self.assertIn('0 authors without a name key', out.getvalue())
+        self.assertNotIn('Removed', out.getvalue())
+
+
+class TestDedupeBeforeUniqueKey(TransactionTestCase):
+
+    def migrate(self, target):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate([target] if target else executor.loader.graph.leaf_nodes())
+
+    def test_runs_between_0008_and_0009(self):
+        self.migrate(('books', '0008_author_name_key'))
+        self.addCleanup(self.migrate, None)
+        book_id = '5e31b88e728e484cb8ee17a112edee95'
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO books_book (id, title, updated_at) VALUES (%s, 'Inferno', CURRENT_TIMESTAMP)", [book_id]
+            )
+            for author_id, name in enumerate(['Dan Brown', 'dan  brown', 'DAN BROWN'], 1):
+                cursor.execute('INSERT INTO books_author (id, name) VALUES (%s, %s)', [author_id, name])
+                cursor.execute(
+                    'INSERT INTO books_book_author (book_id, author_id) VALUES (%s, %s)', [book_id, author_id]
+                )
+
+        out = io.StringIO()
+        call_command('dedupe_authors', stdout=out)
+        self.assertIn('Removed 2 duplicate authors', out.getvalue())
+        self.assertIn('Unapplied migrations', out.getvalue())
+
+        self.migrate(None)
+        book = Book.objects.get()
+        self.assertEqual(list(book.author.values_list('name', flat=True)), ['Dan Brown'])
+        self.assertEqual(book.authors_display, 'Dan Brown')
+        self.assertEqual(FacetCount.objects.get(facet=FacetCount.AUTHOR).count, 1)
+
+
+class TestAuthorsDisplay(TestCase):
+
+    def test_kept_in_sync_with_links(self):
+        book = Book.objects.create(title='Inferno')
+        dan, jk = Author.objects.create(name='Dan Brown'), Author.objects.create(name='J. K. Rowling')
+        book.author.add(dan, jk)
+        book.refresh_from_db()
+        self.assertEqual(book.authors_display, 'Dan Brown; J. K. Rowling')
+        self.assertEqual(book.authors_list, ['Dan Brown', 'J. K. Rowling'])
+        book.author.remove(dan)
+        book.refresh_from_db()
+        self.assertEqual(book.authors_list, ['J. K. Rowling'])
+        book.author.clear()
+        book.refresh_from_db()
+        self.assertEqual(book.authors_list, [])
+
+    def test_set_on_import(self):
+        import_volumes([
+            volume(9780000000001, authors=['Dan Brown', 'J. K. Rowling']),
+            volume(9780000000002, authors=['dan brown', 'DAN BROWN ']),
+            volume(9780000000003),
+        ])
+        display = dict(Book.objects.values_list('isbn', 'authors_display'))
+        self.assertEqual(display, {
+            9780000000001: 'Dan Brown; J. K. Rowling',
+            9780000000002: 'Dan Brown',
+            9780000000003: '',
+        })
+
+    def test_backfill_command(self):
+        book = Book.objects.create(title='Inferno')
+        book.author.add(Author.objects.create(name='Dan Brown'))
+        Book.objects.update(authors_display='')
+        out = io.StringIO()
+        call_command('backfill_authors_display', chunk_size=1, stdout=out)
+        book.refresh_from_db()
+        self.assertEqual(book.authors_display, 'Dan Brown')
+        self.assertIn('Backfilled authors for 1 books', out.getvalue())
@@ -0,0 +1,187 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from books.cache import LRUCache, ResponseCache, normalize_url, get_cache_key
+from books.cache import get_catalogue_version, bump_catalogue_version, page_cache_stats
+from books.client import UpstreamError
+from books.functions import import_volumes
+from books.models import Book, CatalogueVersion
+from books.tests.utils import StubServer, volume
+
+
+def etag_handler(etag='"v1"'):
+    def handler(path, query, headers):
+        if headers.get('If-None-Match') == etag:
+            return 304, {'ETag': etag}, b''
+        return 200, {'ETag': etag}, {'totalItems': 1, 'q': query.get('q')}
+    return handler
+
+
+class TestLRUCache(SimpleTestCase):
+
+    def test_evicts_least_recently_used(self):
+        lru = LRUCache(2)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+        self.assertEqual(lru.get('a'), 1)
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual(len(lru), 2)
+
+
+class TestCacheKey(SimpleTestCase):
+
+    def test_normalize_url(self):
+        self.assertEqual(
+            normalize_url('HTTPS://www.GoogleApis.com/books/v1/volumes?q=Harry  Potter&maxResults=40'),
+            'https://www.googleapis.com/books/v1/volumes?maxResults=40&q=Harry+Potter'
+        )
+
+    def test_equivalent_queries_share_key(self):
+        self.assertEqual(
+            get_cache_key('https://example.com/volumes?q=A&startIndex=0'),
+            get_cache_key('https://example.com/volumes?startIndex=0&q= A')
+        )
+
+
+@override_settings(UPSTREAM_BACKOFF=0, UPSTREAM_RETRIES=0)
+class TestResponseCache(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.cache = ResponseCache(ttl=60, stale_ttl=60, maxsize=10)
+
+    def test_repeat_query_served_from_cache(self):
+        with StubServer(etag_handler()) as server:
+            url = f'{server.url}/volumes?q=A'
+            first = self.cache.get_json(url)
+            second = self.cache.get_json(url)
+        self.assertEqual(first, second)
+        self.assertEqual(len(server.requests), 1)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertEqual(self.cache.stats()['misses'], 1)
+
+    def test_shared_cache_layer(self):
+        with StubServer(etag_handler()) as server:
+            url = f'{server.url}/volumes?q=A'
+            self.cache.get_json(url)
+            other = ResponseCache(ttl=60, stale_ttl=60, maxsize=10)
+            other.get_json(url)
+        self.assertEqual(len(server.requests), 1)
+        self.assertEqual(other.stats()['hits'], 1)
+
+    def test_expired_entry_revalidated(self):
+        self.cache.ttl = -1
+        with StubServer(etag_handler()) as server:
+            url = f'{server.url}/volumes?q=A'
+            first = self.cache.get_json(url)
+            second = self.cache.get_json(url)
+        self.assertEqual(first, second)
+        self.assertEqual(server.requests[1][2]['If-None-Match'], '"v1"')
+        self.assertEqual(self.cache.stats()['revalidations'], 1)
+
+    def test_error_not_cached(self):
+        with StubServer(lambda *args: (404, {}, b'')) as server:
+            with self.assertRaises(UpstreamError):
+                self.cache.get_json(f'{server.url}/volumes?q=A')
+            with self.assertRaises(UpstreamError):
+                self.cache.get_json(f'{server.url}/volumes?q=A')
+        self.assertEqual(len(server.requests), 2)
+
+    def test_disabled_cache(self):
+        self.cache.ttl = 0
+        with StubServer(etag_handler()) as server:
+            url = f'{server.url}/volumes?q=A'
+            self.cache.get_json(url)
+            self.cache.get_json(url)
+        self.assertEqual(len(server.requests), 2)
+
+
+@override_settings(BOOKS_PAGE_CACHE_TIMEOUT=60)
+class TestPageCache(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.book = Book.objects.create(title='The Da Vinci Code')
+
+    def setUp(self):
+        cache.clear()
+        page_cache_stats.hits = page_cache_stats.misses = 0
+
+    def test_catalogue_version(self):
+        version = get_catalogue_version()
+        bump_catalogue_version()
+        self.assertEqual(get_catalogue_version(), version + 1)
+
+    def test_version_shared_through_database(self):
+        bump_catalogue_version()
+        version = get_catalogue_version()
+        cache.clear()
+        self.assertEqual(get_catalogue_version(), version)
+        self.assertEqual(CatalogueVersion.objects.get().version, version)
+
+    def test_page_served_from_cache(self):
+        url = reverse('book_list')
+        self.client.get(url, {'title': 'Vinci'})
+        # Only the catalogue version and the conditional request aggregate run.
+        with self.assertNumQueries(2):
+            response = self.client.get(url, {'language': '', 'title': 'Vinci'})
+        self.assertContains(response, 'The Da Vinci Code')
+        self.assertEqual(page_cache_stats.as_dict(), {'hits': 1, 'misses': 1})
+
+    def test_api_served_from_cache(self):
+        url = reverse('BookList')
+        first = self.client.get(url)
+        with self.assertNumQueries(2):
+            second = self.client.get(url)
+        self.assertEqual(first.json(), second.json())
+
+    @override_settings(ALLOWED_HOSTS=['*'])
+    def test_host_part_of_key(self):
+        Book.objects.create(title='Inferno')
+        url = reverse('BookList')
+        self.client.get(url, {'page_size': 1}, HTTP_HOST='evil.example')
+        response = self.client.get(url, {'page_size': 1})
+        self.assertTrue(response.json()['next'].startswith('http://testserver/'))
+        response = self.client.get(url, {'page_size': 1}, secure=True)
+        self.assertTrue(response.json()['next'].startswith('https://testserver/'))
+
+    def test_home_view_cached(self):
+        self.client.get(reverse('home_view'))
+        self.client.get(reverse('home_view'))
+        self.assertEqual(page_cache_stats.hits, 1)
+
+    def test_write_invalidates_pages(self):
+        url = reverse('book_list')
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Book.objects.create(title='Harry Potter')
+        response = self.client.get(url)
+        self.assertContains(response, 'Harry Potter')
+
+    def test_author_change_invalidates_pages(self):
+        url = reverse('BookList')
+        self.client.get(url, {'embed': 'authors'})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book.author.create(name='Dan Brown')
+        response = self.client.get(url, {'embed': 'authors'})
+        self.assertEqual(response.json()['results'][0]['author'], ['Dan Brown'])
+
+    def test_import_invalidates_pages(self):
+        url = reverse('book_list')
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            import_volumes([volume(9780000000001, 'Harry Potter')])
+        self.assertContains(self.client.get(url), 'Harry Potter')
+
+    def test_post_not_cached(self):
+        self.client.post(reverse('book_import'), {})
+        self.assertEqual(page_cache_stats.as_dict(), {'hits': 0, 'misses': 0})
+
+    @override_settings(BOOKS_PAGE_CACHE_TIMEOUT=0)
+    def test_disabled_cache(self):
+        self.client.get(reverse('book_list'))
+        self.client.get(reverse('book_list'))
+        self.assertEqual(page_cache_stats.as_dict(), {'hits': 0, 'misses': 0})
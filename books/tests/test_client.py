@@ -0,0 +1,124 @@
+import time
+
+from django.test import SimpleTestCase, override_settings
+
+from books.client import CircuitBreaker, UpstreamClient, UpstreamError, CircuitOpenError, get_client
+from books.tests.utils import StubServer
+
+
+def flaky_handler(failures, status=503):
+    calls = []
+
+    def handler(path, query, headers):
+        calls.append(path)
+        if len(calls) <= failures:
+            return status, {}, b'error'
+        return 200, {}, {'totalItems': 0}
+    return handler
+
+
+class TestUpstreamClient(SimpleTestCase):
+
+    def setUp(self):
+        self.client = UpstreamClient(
+            timeout=0.5,
+            retries=2,
+            backoff=0,
+            pool_size=2,
+            failure_threshold=2,
+            reset_timeout=60
+        )
+
+    def test_get_json(self):
+        with StubServer(flaky_handler(0)) as server:
+            self.assertEqual(self.client.get_json(f'{server.url}/volumes'), {'totalItems': 0})
+
+    def test_retry_on_server_error(self):
+        with StubServer(flaky_handler(2)) as server:
+            self.assertEqual(self.client.get_json(f'{server.url}/volumes'), {'totalItems': 0})
+        self.assertEqual(len(server.requests), 3)
+
+    def test_give_up_after_retries(self):
+        with StubServer(flaky_handler(3)) as server:
+            with self.assertRaises(UpstreamError):
+                self.client.get_json(f'{server.url}/volumes')
+        self.assertEqual(len(server.requests), 3)
+
+    def test_client_error_not_retried(self):
+        with StubServer(flaky_handler(1, status=404)) as server:
+            with self.assertRaises(UpstreamError):
+                self.client.get_json(f'{server.url}/volumes')
+        self.assertEqual(len(server.requests), 1)
+
+    def test_timeout(self):
+        def handler(path, query, headers):
+            time.sleep(1)
+            return 200, {}, {}
+
+        with StubServer(handler) as server:
+            start = time.monotonic()
+            with self.assertRaises(UpstreamError):
+                self.client.get(f'{server.url}/volumes', timeout=0.1)
+        self.assertLess(time.monotonic() - start, 1)
+
+    def test_connection_reused(self):
+        with StubServer(flaky_handler(0)) as server:
+            for _ in range(3):
+                self.client.get_json(f'{server.url}/volumes')
+        self.assertEqual(len(set(server.connections)), 1)
+
+    def test_circuit_opens_after_failures(self):
+        with StubServer(flaky_handler(100)) as server:
+            for _ in range(2):
+                with self.assertRaises(UpstreamError):
+                    self.client.get(f'{server.url}/volumes')
+            with self.assertRaises(CircuitOpenError):
+                self.client.get(f'{server.url}/volumes')
+        self.assertEqual(len(server.requests), 6)
+
+    def test_circuit_half_open_after_reset_timeout(self):
+        self.client.reset_timeout = 0
+        with StubServer(flaky_handler(6)) as server:
+            for _ in range(2):
+                with self.assertRaises(UpstreamError):
+                    self.client.get(f'{server.url}/volumes')
+            self.assertEqual(self.client.get_json(f'{server.url}/volumes'), {'totalItems': 0})
+
+    def test_half_open_allows_one_trial_call(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+        breaker.opened_at -= 60
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+        breaker.opened_at -= 60
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertTrue(breaker.allow())
+        self.assertTrue(breaker.allow())
+
+    def test_retried_streamed_responses_released(self):
+        with StubServer(flaky_handler(2)) as server:
+            r = self.client.get(f'{server.url}/volumes', stream=True)
+            self.assertEqual(r.json(), {'totalItems': 0})
+        self.assertEqual(len(set(server.connections)), 1)
+
+    def test_delay_is_bounded(self):
+        self.client.backoff = 1
+        self.client.max_backoff = 4
+        for attempt in range(10):
+            self.assertLessEqual(self.client.get_delay(attempt), 4)
+
+
+class TestSharedClient(SimpleTestCase):
+
+    def test_shared_client(self):
+        self.assertIs(get_client(), get_client())
+
+    def test_settings_change_resets_client(self):
+        client = get_client()
+        with override_settings(UPSTREAM_RETRIES=0):
+            self.assertIsNot(get_client(), client)
+            self.assertEqual(get_client().retries, 0)
@@ -0,0 +1,94 @@
+import datetime
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.http import http_date
+
+from books.models import Book, Author, CatalogueVersion
+
+
+@override_settings(BOOKS_PAGE_CACHE_TIMEOUT=0)
+class TestConditionalRequests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.book = Book.objects.create(title='The Da Vinci Code')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_validators_sent(self):
+        for url in (reverse('book_list'), reverse('BookList')):
+            response = self.client.get(url)
+            self.assertTrue(response.has_header('ETag'))
+            self.assertTrue(response.has_header('Last-Modified'))
+
+    def test_not_modified(self):
+        for url in (reverse('book_list'), reverse('BookList')):
+            etag = self.client.get(url)['ETag']
+            with self.assertNumQueries(2):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.content, b'')
+
+    def test_not_modified_since(self):
+        last_modified = self.client.get(reverse('BookList'))['Last-Modified']
+        response = self.client.get(reverse('BookList'), HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_modified_since(self):
+        since = http_date(self.book.updated_at.timestamp() - 60)
+        response = self.client.get(reverse('BookList'), HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, 200)
+
+    def test_book_delete_modifies(self):
+        yesterday = self.book.updated_at - datetime.timedelta(days=1)
+        for url in (reverse('book_list'), reverse('BookList')):
+            Book.objects.create(title='Harry Potter')
+            Book.objects.update(updated_at=yesterday)
+            CatalogueVersion.objects.update(updated_at=yesterday)
+            last_modified = self.client.get(url)['Last-Modified']
+            with self.captureOnCommitCallbacks(execute=True):
+                Book.objects.filter(title='Harry Potter').delete()
+            response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotContains(response, 'Harry Potter')
+
+    def test_etag_depends_on_content_type(self):
+        json_etag = self.client.get(reverse('BookList'), HTTP_ACCEPT='application/json')['ETag']
+        html_etag = self.client.get(reverse('BookList'), HTTP_ACCEPT='text/html')['ETag']
+        self.assertNotEqual(json_etag, html_etag)
+
+    def assertEtagChanges(self, change):
+        etag = self.client.get(reverse('BookList'))['ETag']
+        change()
+        response = self.client.get(reverse('BookList'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_book_update_changes_etag(self):
+        def change():
+            self.book.title = 'Angels And Demons'
+            self.book.save()
+        self.assertEtagChanges(change)
+
+    def test_book_delete_changes_etag(self):
+        Book.objects.create(title='Harry Potter')
+        self.assertEtagChanges(self.book.delete)
+
+    def test_author_change_changes_etag(self):
+        author = Author.objects.create(name='Dan Brown')
+        self.book.author.add(author)
+
+        def change():
+            author.name = 'Daniel Brown'
+            author.save()
+        self.assertEtagChanges(change)
+
+    def test_new_author_without_books_changes_etag(self):
+        etag = self.client.get(reverse('book_list'))['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Author.objects.create(name='Newauthor')
+        response = self.client.get(reverse('book_list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Newauthor')
@@ -0,0 +1,142 @@
+import os
+import shutil
+import tempfile
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from books.covers import CoverError, CoverStore, check_cover_url, fetch_cover, get_cover_store, prefetch_cover
+from books.models import Book
+from books.tests.utils import StubServer
+
+
+PNG = b'\x89PNG\r\n\x1a\ncover'
+
+
+def cover_handler(path, query, headers):
+    if path == '/text':
+        return 200, {'Content-Type': 'text/html'}, b'<html></html>'
+    if path == '/svg':
+        return 200, {'Content-Type': 'image/svg+xml'}, b'<svg onload="alert(1)"/>'
+    if path == '/redirect':
+        return 302, {'Location': '/cover.png'}, b''
+    return 200, {'Content-Type': 'image/png'}, PNG
+
+
+class CoverDirMixin:
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        settings = override_settings(
+            BOOKS_COVER_DIR=directory,
+            BOOKS_COVER_ALLOW_PRIVATE_HOSTS=True,
+            UPSTREAM_RETRIES=0
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+
+class TestCoverStore(CoverDirMixin, SimpleTestCase):
+
+    def test_stored_by_content(self):
+        store = get_cover_store()
+        digest = store.put('http://a/1', PNG, 'image/png')
+        self.assertEqual(store.put('http://b/2', PNG, 'image/png'), digest)
+        self.assertEqual(len(list(store.iter_blobs())), 1)
+        path, stored_digest, content_type = store.get('http://b/2')
+        self.assertEqual((path.read_bytes(), stored_digest, content_type), (PNG, digest, 'image/png'))
+        self.assertIsNone(store.get('http://c/3'))
+
+    def test_least_recently_used_evicted(self):
+        store = CoverStore(get_cover_store().directory, max_size=10)
+        first = store.put('http://a/1', b'12345', 'image/png')
+        second = store.put('http://a/2', b'67890', 'image/png')
+        os.utime(store.get_blob_path(first), (0, 0))
+        os.utime(store.get_blob_path(second), (1, 1))
+        store.get('http://a/1')
+        store.put('http://a/3', b'abcde', 'image/png')
+        self.assertIsNotNone(store.get('http://a/1'))
+        self.assertIsNone(store.get('http://a/2'))
+        self.assertIsNotNone(store.get('http://a/3'))
+        self.assertEqual(store.size, 10)
+
+
+class TestFetchCover(CoverDirMixin, SimpleTestCase):
+
+    def test_fetched_once(self):
+        with StubServer(cover_handler) as server:
+            digest = fetch_cover(f'{server.url}/cover.png')
+            self.assertEqual(prefetch_cover(f'{server.url}/cover.png').result(timeout=5), digest)
+        self.assertEqual(len(server.requests), 1)
+
+    def test_not_an_image(self):
+        with StubServer(cover_handler) as server:
+            with self.assertRaises(CoverError):
+                fetch_cover(f'{server.url}/text')
+
+    def test_svg_rejected(self):
+        with StubServer(cover_handler) as server:
+            with self.assertRaises(CoverError):
+                fetch_cover(f'{server.url}/svg')
+        self.assertIsNone(get_cover_store().get(f'{server.url}/svg'))
+
+    def test_redirect_not_followed(self):
+        with StubServer(cover_handler) as server:
+            with self.assertRaises(CoverError):
+                fetch_cover(f'{server.url}/redirect')
+        self.assertEqual(len(server.requests), 1)
+
+    @override_settings(BOOKS_COVER_ALLOW_PRIVATE_HOSTS=False)
+    def test_private_hosts_rejected(self):
+        with StubServer(cover_handler) as server:
+            with self.assertRaises(CoverError):
+                fetch_cover(f'{server.url}/cover.png')
+        self.assertEqual(server.requests, [])
+        for url in ('http://10.0.0.1/a.png', 'http://169.254.169.254/latest', 'http://[::ffff:127.0.0.1]/a.png',
+                    'file:///etc/passwd'):
+            with self.assertRaises(CoverError):
+                check_cover_url(url)
+
+    @override_settings(BOOKS_COVER_MAX_BYTES=4)
+    def test_too_large(self):
+        with StubServer(cover_handler) as server:
+            with self.assertRaises(CoverError):
+                fetch_cover(f'{server.url}/cover.png')
+        self.assertIsNone(get_cover_store().get(f'{server.url}/cover.png'))
+
+
+class TestCoverView(CoverDirMixin, TestCase):
+
+    def test_served_from_disk_after_background_fetch(self):
+        with StubServer(cover_handler) as server:
+            book = Book.objects.create(title='Inferno', image_url=f'{server.url}/cover.png')
+            url = reverse('book_cover', kwargs={'pk': book.pk})
+            response = self.client.get(url)
+            self.assertRedirects(response, book.image_url, fetch_redirect_response=False)
+            digest = prefetch_cover(book.image_url).result(timeout=5)
+
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(b''.join(response.streaming_content), PNG)
+            self.assertEqual(response['Content-Type'], 'image/png')
+            self.assertEqual(response['ETag'], f'"{digest}"')
+            self.assertIn('max-age=2592000', response['Cache-Control'])
+            self.assertIn('sandbox', response['Content-Security-Policy'])
+            self.assertEqual(response['X-Content-Type-Options'], 'nosniff')
+
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=f'"{digest}"')
+            self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(server.requests), 1)
+
+    def test_stored_svg_not_served(self):
+        book = Book.objects.create(title='Inferno', image_url='http://a/cover.svg')
+        get_cover_store().put(book.image_url, b'<svg/>', 'image/svg+xml')
+        response = self.client.get(reverse('book_cover', kwargs={'pk': book.pk}))
+        self.assertRedirects(response, book.image_url, fetch_redirect_response=False)
+
+    def test_book_without_cover(self):
+        book = Book.objects.create(title='Inferno')
+        response = self.client.get(reverse('book_cover', kwargs={'pk': book.pk}))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,114 @@
+import gzip
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from books.dumps import get_format, iter_json_records
+from books.models import Book
+from books.tests.utils import volume
+
+
+def response(isbns):
+    return {'kind': 'books#volumes', 'totalItems': len(isbns), 'items': [volume(isbn) for isbn in isbns]}
+
+
+class TestJsonRecords(SimpleTestCase):
+
+    def records(self, data):
+        return list(iter_json_records(io.StringIO(json.dumps(data, indent=1)), chunk_size=7))
+
+    def test_response_items_streamed(self):
+        data = response([9780000000001, 9780000000002])
+        self.assertEqual(self.records(data), data['items'])
+
+    def test_items_before_other_keys(self):
+        data = {'items': [volume(9780000000001)], 'totalItems': 1, 'kind': 'books#volumes'}
+        self.assertEqual(self.records(data), data['items'])
+
+    def test_array_of_records(self):
+        data = [response([9780000000001]), volume(9780000000002), 12345]
+        self.assertEqual(self.records(data), data)
+
+    def test_empty(self):
+        self.assertEqual(self.records([]), [])
+        self.assertEqual(self.records({'totalItems': 0}), [])
+
+    def test_truncated(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_records(io.StringIO('[{"volumeInfo": {}}, ')))
+
+    def test_format(self):
+        self.assertEqual(get_format('dump.json'), 'json')
+        self.assertEqual(get_format('dump.ndjson.gz'), 'ndjson')
+        self.assertEqual(get_format('dump.jsonl'), 'ndjson')
+
+
+class TestLoadGoogleDump(TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write(self, name, lines):
+        path = os.path.join(self.directory, name)
+        with (gzip.open(path, 'wt') if name.endswith('.gz') else open(path, 'w')) as dump:
+            dump.write('\n'.join(lines))
+        return path
+
+    def load(self, path, **options):
+        call_command('load_google_dump', path, stdout=io.StringIO(), **options)
+
+    def test_json_response(self):
+        path = self.write('dump.json', [json.dumps(response(range(9780000000000, 9780000000050)))])
+        self.load(path, batch_size=20)
+        self.assertEqual(Book.objects.count(), 50)
+        self.assertFalse(os.path.exists(path + '.checkpoint'))
+
+    def test_ndjson_volumes_and_responses(self):
+        path = self.write('dump.ndjson.gz', [
+            json.dumps(volume(9780000000001)),
+            '',
+            json.dumps(response([9780000000002, 9780000000003])),
+            json.dumps(volume(9780000000001)),
+        ])
+        self.load(path, batch_size=2)
+        self.assertEqual(Book.objects.count(), 3)
+
+    def test_invalid_volumes_skipped(self):
+        bad_links = volume(9780000000004)
+        bad_links['volumeInfo']['imageLinks'] = ['image']
+        no_type = volume(9780000000003)
+        no_type['volumeInfo']['industryIdentifiers'] = [{'identifier': '9780000000003'}]
+        path = self.write('dump.ndjson', [
+            json.dumps(volume(9780000000001)),
+            json.dumps(bad_links),
+            json.dumps(no_type),
+            json.dumps(volume(9780000000002)),
+        ])
+        out = io.StringIO()
+        call_command('load_google_dump', path, batch_size=10, stdout=out, stderr=io.StringIO())
+        self.assertEqual(Book.objects.count(), 2)
+        self.assertIn('skipped 2 invalid volumes', out.getvalue())
+        self.assertFalse(os.path.exists(path + '.checkpoint'))
+
+    def test_resume_from_checkpoint(self):
+        path = self.write('dump.ndjson', [json.dumps(volume(isbn)) for isbn in range(9780000000000, 9780000000010)])
+        with open(path + '.checkpoint', 'w') as checkpoint:
+            json.dump({'records': 6, 'volumes': 6, 'imported_books': 6}, checkpoint)
+        self.load(path)
+        self.assertEqual(
+            sorted(Book.objects.values_list('isbn', flat=True)),
+            list(range(9780000000006, 9780000000010))
+        )
+
+    def test_restart_ignores_checkpoint(self):
+        path = self.write('dump.ndjson', [json.dumps(volume(isbn)) for isbn in range(9780000000000, 9780000000010)])
+        with open(path + '.checkpoint', 'w') as checkpoint:
+            json.dump({'records': 6, 'volumes': 6, 'imported_books': 6}, checkpoint)
+        self.load(path, restart=True)
+        self.assertEqual(Book.objects.count(), 10)
@@ -0,0 +1,69 @@
+import csv
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from books.export import export_books
+from books.models import Book, Author
+
+
+class TestExport(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Author.objects.create(name='Dan Brown')
+        for i in range(5):
+            book = Book.objects.create(title=f'Book {i}', language='en' if i % 2 else 'pl', isbn=9780000000000 + i)
+            book.author.add(cls.author)
+
+    def read_ndjson(self, lines):
+        return [json.loads(line) for line in lines]
+
+    def test_ndjson(self):
+        books = self.read_ndjson(export_books(Book.objects.all(), 'ndjson'))
+        self.assertEqual(len(books), 5)
+        self.assertEqual(books[0]['authors'], ['Dan Brown'])
+
+    def test_csv(self):
+        rows = list(csv.reader(export_books(Book.objects.all(), 'csv')))
+        self.assertEqual(rows[0][:3], ['id', 'title', 'authors'])
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[1][2], 'Dan Brown')
+
+    def test_authors_read_from_book_rows(self):
+        with self.assertNumQueries(1):
+            list(export_books(Book.objects.all(), 'ndjson', chunk_size=2))
+
+    def test_streaming_view(self):
+        response = self.client.get(reverse('book_export', kwargs={'export_format': 'ndjson'}), {'language': 'pl'})
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        books = self.read_ndjson(b''.join(response.streaming_content).decode().splitlines())
+        self.assertEqual(len(books), 3)
+
+    def test_view_invalid_filter(self):
+        url = reverse('book_export', kwargs={'export_format': 'csv'})
+        response = self.client.get(url, {'publication_date__gt': 'invalid'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_view_unknown_format(self):
+        response = self.client.get(reverse('book_export', kwargs={'export_format': 'xml'}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'books.csv')
+            call_command('export_books', format='csv', output=path, language='en')
+            with open(path) as f:
+                rows = list(csv.reader(f))
+        self.assertEqual(len(rows), 3)
+
+    def test_command_stdout(self):
+        out = io.StringIO()
+        call_command('export_books', stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 5)
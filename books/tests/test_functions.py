@@ -4,8 +4,9 @@ from books.functions import get_query, get_books_from_google
 from books.functions import validate_pages, validate_image_url
 from books.functions import validate_authors, validate_date
 from books.functions import validate_isbn, validate_language
-from books.functions import validate_title
-from books.models import Book
+from books.functions import validate_title, import_volumes
+from books.models import Book, Author
+from books.tests.utils import volume
 
 
 class TestPagesValidator(TestCase):
@@ -237,4 +238,81 @@ class TestBookImport(TestCase):
     def test_books_imported(self):
         imported_books = get_books_from_google(self.query)
         created_books = Book.objects.all().count()
-        self.assertEqual(imported_books, created_books)
\ No newline at end of file
+        self.assertEqual(imported_books, created_books)
+
+
+class TestVolumesImport(TestCase):
+
+    def test_malformed_date_does_not_abort_page(self):
+        bad = volume(9780000000002)
+        bad['volumeInfo']['publishedDate'] = '2003-05-17T00:00:00Z'
+        empty = volume(9780000000003)
+        empty['volumeInfo']['publishedDate'] = ''
+        self.assertEqual(import_volumes([volume(9780000000001), bad, empty]), 3)
+        dates = dict(Book.objects.values_list('isbn', 'publication_date'))
+        self.assertEqual(str(dates[9780000000002]), '2003-05-17')
+        self.assertIsNone(dates[9780000000003])
+
+    def test_books_and_authors_created(self):
+        items = [
+            volume(9780000000001, 'A', ['Dan Brown']),
+            volume(9780000000002, 'B', ['Dan Brown', 'J. K. Rownling']),
+        ]
+        self.assertEqual(import_volumes(items), 2)
+        self.assertEqual(Book.objects.count(), 2)
+        self.assertEqual(Author.objects.count(), 2)
+        book = Book.objects.get(isbn=9780000000002)
+        self.assertEqual(book.author.count(), 2)
+        self.assertEqual(str(book.publication_date), '2003-01-01')
+
+    def test_existing_books_and_authors_reused(self):
+        Author.objects.create(name='Dan Brown')
+        Book.objects.create(title='A', isbn=9780000000001)
+        items = [
+            volume(9780000000001, 'A', ['Dan Brown']),
+            volume(9780000000002, 'B', ['Dan Brown']),
+            volume(9780000000002, 'B', ['Dan Brown']),
+        ]
+        self.assertEqual(import_volumes(items), 1)
+        self.assertEqual(Book.objects.count(), 2)
+        self.assertEqual(Author.objects.count(), 1)
+
+    def test_skip_volumes_without_isbn_or_title(self):
+        items = [{'volumeInfo': {'title': 'A'}}, {'volumeInfo': {}}]
+        with self.assertNumQueries(0):
+            self.assertEqual(import_volumes(items), 0)
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        small = [volume(9780000000001 + i, authors=[f'A{i}']) for i in range(2)]
+        large = [volume(9780000000101 + i, authors=[f'B{i}', 'C']) for i in range(40)]
+        with self.assertNumQueries(16):
+            import_volumes(small)
+        with self.assertNumQueries(16):
+            import_volumes(large)
+
+    def test_existing_books_not_updated_without_refresh(self):
+        Book.objects.create(title='Old', isbn=9780000000001)
+        self.assertEqual(import_volumes([volume(9780000000001, 'New', ['Dan Brown'])]), 0)
+        book = Book.objects.get(isbn=9780000000001)
+        self.assertEqual(book.title, 'Old')
+        self.assertEqual(book.author.count(), 0)
+
+    def test_refresh_updates_stale_books(self):
+        book = Book.objects.create(title='Old', isbn=9780000000001, pages=10)
+        item = volume(9780000000001, 'New', ['Dan Brown'])
+        item['volumeInfo']['imageLinks'] = {'thumbnail': 'https://example.com/cover.jpg'}
+        self.assertEqual(import_volumes([item], refresh=True), 0)
+        refreshed = Book.objects.get(isbn=9780000000001)
+        self.assertEqual(refreshed.pk, book.pk)
+        self.assertEqual(refreshed.title, 'New')
+        self.assertEqual(refreshed.pages, 100)
+        self.assertEqual(refreshed.image_url, 'https://example.com/cover.jpg')
+        self.assertGreater(refreshed.updated_at, book.updated_at)
+        self.assertEqual([author.name for author in refreshed.author.all()], ['Dan Brown'])
+
+    def test_refresh_skips_current_books(self):
+        import_volumes([volume(9780000000001, 'A', ['Dan Brown'])])
+        updated_at = Book.objects.get().updated_at
+        with self.assertNumQueries(6):
+            import_volumes([volume(9780000000001, 'A', ['Dan Brown'])], refresh=True)
+        self.assertEqual(Book.objects.get().updated_at, updated_at)
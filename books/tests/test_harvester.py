@@ -0,0 +1,49 @@
+from django.test import TestCase, override_settings
+
+from books.harvester import harvest, import_harvest, get_page_query
+from books.models import Book
+from books.tests.utils import StubServer, volume
+
+
+def volumes_handler(total_items):
+    def handler(path, query, headers):
+        start_index = int(query['startIndex'])
+        max_results = int(query['maxResults'])
+        end_index = min(start_index + max_results, total_items)
+        items = [volume(9780000000000 + i) for i in range(start_index, end_index)]
+        return 200, {}, {'totalItems': total_items, 'items': items}
+    return handler
+
+
+@override_settings(GOOGLE_BOOKS_CACHE_TTL=0, GOOGLE_BOOKS_RATE_LIMIT=1000)
+class TestHarvester(TestCase):
+
+    def test_page_query(self):
+        self.assertEqual(
+            get_page_query('https://example.com/volumes?q=A', 80),
+            'https://example.com/volumes?q=A&startIndex=80&maxResults=40'
+        )
+
+    def test_all_pages_fetched(self):
+        with StubServer(volumes_handler(95)) as server:
+            pages = list(harvest(f'{server.url}/volumes?q=A', workers=2))
+        self.assertEqual(sorted(len(items) for items in pages), [15, 40, 40])
+        start_indexes = sorted(int(query['startIndex']) for _, query, _ in server.requests)
+        self.assertEqual(start_indexes, [0, 40, 80])
+        self.assertTrue(all(query['maxResults'] == '40' for _, query, _ in server.requests))
+
+    def test_max_items_limits_pages(self):
+        with StubServer(volumes_handler(500)) as server:
+            pages = list(harvest(f'{server.url}/volumes?q=A', max_items=100))
+        self.assertEqual(len(pages), 3)
+
+    def test_no_results(self):
+        with StubServer(volumes_handler(0)) as server:
+            pages = list(harvest(f'{server.url}/volumes?q=A'))
+        self.assertEqual(pages, [[]])
+
+    def test_pages_imported(self):
+        with StubServer(volumes_handler(90)) as server:
+            imported_books = import_harvest(f'{server.url}/volumes?q=A')
+        self.assertEqual(imported_books, 90)
+        self.assertEqual(Book.objects.count(), 90)
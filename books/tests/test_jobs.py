@@ -0,0 +1,73 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from books.jobs import submit_job, cancel_job, claim_job, expire_jobs, run_job, work
+from books.models import Book, ImportJob
+from books.tests.test_harvester import volumes_handler
+from books.tests.utils import StubServer
+
+
+@override_settings(GOOGLE_BOOKS_CACHE_TTL=0, GOOGLE_BOOKS_RATE_LIMIT=1000, UPSTREAM_BACKOFF=0)
+class TestImportJobs(TestCase):
+
+    def test_claim_job(self):
+        job = submit_job('https://example.com/volumes?q=A')
+        claimed = claim_job()
+        self.assertEqual(claimed, job)
+        self.assertEqual(claimed.status, ImportJob.RUNNING)
+        self.assertIsNone(claim_job())
+
+    def test_run_job(self):
+        with StubServer(volumes_handler(60)) as server:
+            job = submit_job(f'{server.url}/volumes?q=A')
+            work(once=True)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJob.DONE)
+        self.assertEqual(job.fetched_items, 60)
+        self.assertEqual(job.imported_books, 60)
+        self.assertEqual(Book.objects.count(), 60)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_failed_job(self):
+        with StubServer(lambda *args: (500, {}, b'error')) as server:
+            job = submit_job(f'{server.url}/volumes?q=A')
+            run_job(claim_job())
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJob.FAILED)
+        self.assertTrue(job.error)
+
+    def test_cancel_pending_job(self):
+        job = submit_job('https://example.com/volumes?q=A')
+        cancel_job(job)
+        self.assertEqual(job.status, ImportJob.CANCELLED)
+        self.assertIsNone(claim_job())
+
+    def test_cancel_running_job(self):
+        with StubServer(volumes_handler(200)) as server:
+            job = submit_job(f'{server.url}/volumes?q=A')
+            claimed = claim_job()
+            cancel_job(job)
+            self.assertEqual(job.status, ImportJob.RUNNING)
+            run_job(claimed)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJob.CANCELLED)
+        self.assertEqual(job.imported_books, 40)
+
+    def test_stale_running_job_failed(self):
+        job = submit_job('https://example.com/volumes?q=A')
+        claim_job()
+        self.assertEqual(expire_jobs(), 0)
+        ImportJob.objects.update(heartbeat_at=timezone.now() - timedelta(hours=1))
+        self.assertIsNone(claim_job())
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJob.FAILED)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_cancel_stale_running_job(self):
+        job = submit_job('https://example.com/volumes?q=A')
+        claim_job()
+        ImportJob.objects.update(heartbeat_at=timezone.now() - timedelta(hours=1))
+        cancel_job(job)
+        self.assertEqual(job.status, ImportJob.CANCELLED)
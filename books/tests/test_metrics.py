@@ -0,0 +1,141 @@
+from datetime import timedelta
+
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from django.urls import reverse
+
+from books import metrics
+from books.client import UpstreamClient
+from books.functions import import_volumes
+from books.metrics import Counter, Histogram
+from books.models import MetricSnapshot
+from books.tests.utils import StubServer, volume
+
+
+class TestMetricTypes(SimpleTestCase):
+
+    def setUp(self):
+        registry = list(metrics.registry)
+        self.addCleanup(metrics.registry.__setitem__, slice(None), registry)
+
+    def test_counter(self):
+        counter = Counter('test_events_total', 'Events', ['kind'])
+        counter.inc('a')
+        counter.inc('a', amount=2)
+        counter.inc('say "hi"\n')
+        self.assertEqual(counter.get('a'), 3)
+        self.assertEqual(counter.render(), '\n'.join([
+            '# HELP test_events_total Events',
+            '# TYPE test_events_total counter',
+            'test_events_total{kind="a"} 3',
+            'test_events_total{kind="say \\"hi\\"\\n"} 1',
+        ]))
+
+    def test_histogram(self):
+        histogram = Histogram('test_seconds', 'Seconds', buckets=(0.1, 1))
+        for value in (0.05, 0.1, 0.5, 5):
+            histogram.observe(value)
+        self.assertEqual(histogram.get_count(), 4)
+        self.assertEqual(histogram.render().split('\n')[2:], [
+            'test_seconds_bucket{le="0.1"} 2',
+            'test_seconds_bucket{le="1"} 3',
+            'test_seconds_bucket{le="+Inf"} 4',
+            'test_seconds_sum 5.65',
+            'test_seconds_count 4',
+        ])
+
+    def test_histogram_timer(self):
+        histogram = Histogram('test_stage_seconds', 'Seconds', ['stage'])
+        with self.assertRaises(ValueError):
+            with histogram.time('parse'):
+                raise ValueError
+        self.assertEqual(histogram.get_count('parse'), 1)
+
+    def test_merged_with_snapshots(self):
+        histogram = Histogram('test_seconds', 'Seconds', buckets=(0.1, 1))
+        histogram.observe(0.05)
+        snapshot = {'test_seconds': [[[], [[0, 1, 1], 5.5, 2]]]}
+        self.assertEqual(histogram.render([snapshot]).split('\n')[2:], [
+            'test_seconds_bucket{le="0.1"} 1',
+            'test_seconds_bucket{le="1"} 2',
+            'test_seconds_bucket{le="+Inf"} 3',
+            'test_seconds_sum 5.55',
+            'test_seconds_count 3',
+        ])
+
+
+class TestRegistry(TestCase):
+
+    def setUp(self):
+        registry = list(metrics.registry)
+        self.addCleanup(metrics.registry.__setitem__, slice(None), registry)
+
+    def test_registered(self):
+        counter = Counter('test_registered_total', 'Registered')
+        self.assertIn('# TYPE test_registered_total counter', metrics.render())
+        self.assertIn(counter, metrics.registry)
+
+
+class TestImportMetrics(TestCase):
+
+    def test_item_outcomes(self):
+        import_volumes([volume(9780000000000)])
+        before = {result: metrics.IMPORT_ITEMS.get(result) for result in ('imported', 'existing', 'skipped')}
+        import_volumes([volume(9780000000000), volume(9780000000001), volume(9780000000001), {'volumeInfo': {}}])
+        self.assertEqual(metrics.IMPORT_ITEMS.get('imported') - before['imported'], 1)
+        self.assertEqual(metrics.IMPORT_ITEMS.get('existing') - before['existing'], 1)
+        self.assertEqual(metrics.IMPORT_ITEMS.get('skipped') - before['skipped'], 2)
+
+    def test_stages_timed(self):
+        before = metrics.IMPORT_STAGE_SECONDS.get_count('write')
+        import_volumes([volume(9780000000000)])
+        self.assertEqual(metrics.IMPORT_STAGE_SECONDS.get_count('write'), before + 1)
+
+    def test_upstream_latency(self):
+        client = UpstreamClient(retries=1, backoff=0)
+        with StubServer(lambda path, query, headers: (200, {}, {'totalItems': 0})) as server:
+            host = server.url.split('//')[1]
+            before = metrics.UPSTREAM_REQUEST_SECONDS.get_count(host, '200')
+            client.get_json(f'{server.url}/volumes')
+        self.assertEqual(metrics.UPSTREAM_REQUEST_SECONDS.get_count(host, '200'), before + 1)
+
+
+@override_settings(BOOKS_PAGE_CACHE_TIMEOUT=0)
+class TestMetricsView(TestCase):
+
+    def test_request_metrics(self):
+        before = metrics.REQUEST_QUERIES.get_count('book_list')
+        self.client.get(reverse('book_list'))
+        self.assertEqual(metrics.REQUEST_QUERIES.get_count('book_list'), before + 1)
+
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response['Content-Type'], metrics.CONTENT_TYPE)
+        content = response.content.decode()
+        self.assertIn('books_request_seconds_count{view="book_list",method="GET",status="200"}', content)
+        self.assertIn('# TYPE books_response_cache_requests_total counter', content)
+        self.assertIn('books_page_cache_requests_total{result="hits"}', content)
+
+    def test_other_processes_merged(self):
+        before = metrics.IMPORT_ITEMS.get('imported')
+        MetricSnapshot.objects.create(process='worker:1', data={'books_import_items_total': [[['imported'], 5]]})
+        response = self.client.get(reverse('metrics'))
+        self.assertIn(f'books_import_items_total{{result="imported"}} {before + 5}', response.content.decode())
+
+    def test_stale_snapshots_dropped(self):
+        MetricSnapshot.objects.create(process='worker:1', data={'books_import_items_total': [[['imported'], 5]]})
+        MetricSnapshot.objects.update(updated_at=timezone.now() - timedelta(days=2))
+        self.client.get(reverse('metrics'))
+        self.assertFalse(MetricSnapshot.objects.exists())
+
+
+class TestFlush(TransactionTestCase):
+
+    def test_flush(self):
+        import_volumes([volume(9780000000000)])
+        metrics.flush()
+        metrics.flush()
+        data = MetricSnapshot.objects.get(process=metrics.PROCESS).data
+        self.assertIn([['imported'], metrics.IMPORT_ITEMS.get('imported')], data['books_import_items_total'])
+        # The process's own row is not counted twice.
+        imported = metrics.IMPORT_ITEMS.get('imported')
+        self.assertIn(f'books_import_items_total{{result="imported"}} {imported}\n', metrics.render())
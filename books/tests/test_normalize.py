@@ -0,0 +1,66 @@
+import datetime
+
+from django.test import SimpleTestCase
+
+from books.normalize import normalize_volumes
+from books.tests.utils import volume
+
+
+class TestNormalizeVolumes(SimpleTestCase):
+
+    def test_row(self):
+        rows = normalize_volumes([volume(9780000000001, authors=['A', 'B', 'A'])])
+        row = rows[9780000000001]
+        self.assertEqual(row.title, 'Title')
+        self.assertEqual(row.publication_date, datetime.date(2003, 1, 1))
+        self.assertEqual(row.pages, 100)
+        self.assertEqual(row.language, 'en')
+        self.assertIsNone(row.image_url)
+        self.assertEqual(row.authors, ('A', 'B'))
+
+    def test_dates(self):
+        dates = {
+            '2003': datetime.date(2003, 1, 1),
+            '2003-05': datetime.date(2003, 5, 1),
+            '2003-05-17': datetime.date(2003, 5, 17),
+            '2003-05-17T00:00:00Z': datetime.date(2003, 5, 17),
+        }
+        for date, expected in dates.items():
+            item = volume(9780000000001)
+            item['volumeInfo']['publishedDate'] = date
+            self.assertEqual(normalize_volumes([item])[9780000000001].publication_date, expected)
+
+    def test_malformed_values(self):
+        for date in ('', '2003-13', '2003-02-30', 'May 2003', '03-05-17', None, 2003):
+            item = volume(9780000000001)
+            item['volumeInfo'].update(publishedDate=date, pageCount='many')
+            row = normalize_volumes([item])[9780000000001]
+            self.assertIsNone(row.publication_date)
+            self.assertIsNone(row.pages)
+
+    def test_isbn_13_preferred(self):
+        item = volume(9780000000001)
+        item['volumeInfo']['industryIdentifiers'] = [
+            {'type': 'ISBN_10', 'identifier': '0000000001'},
+            {'type': 'ISBN_13', 'identifier': '9780000000002'},
+            {'type': 'OTHER', 'identifier': 'OCLC:00000000000000'},
+        ]
+        self.assertEqual(list(normalize_volumes([item])), [9780000000002])
+
+    def test_image_url(self):
+        item = volume(9780000000001)
+        item['volumeInfo']['imageLinks'] = {'smallThumbnail': 'small_image'}
+        self.assertEqual(normalize_volumes([item])[9780000000001].image_url, 'small_image')
+        item['volumeInfo']['imageLinks']['thumbnail'] = 'image'
+        self.assertEqual(normalize_volumes([item])[9780000000001].image_url, 'image')
+
+    def test_incomplete_volumes_skipped(self):
+        no_title = volume(9780000000001)
+        del no_title['volumeInfo']['title']
+        no_isbn = volume(9780000000002)
+        no_isbn['volumeInfo']['industryIdentifiers'] = [{'type': 'OTHER', 'identifier': 'X'}]
+        self.assertEqual(normalize_volumes([no_title, no_isbn]), {})
+
+    def test_first_duplicate_wins(self):
+        rows = normalize_volumes([volume(9780000000001, 'First'), volume(9780000000001, 'Second')])
+        self.assertEqual([row.title for row in rows.values()], ['First'])
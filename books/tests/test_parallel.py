@@ -0,0 +1,67 @@
+import io
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from books.models import Book
+from books.parallel import ShardedImporter, WorkerDied, get_shard, shard_volumes
+from books.tests.utils import volume
+
+
+class TestSharding(SimpleTestCase):
+
+    def test_every_isbn_in_one_shard(self):
+        items = [volume(isbn) for isbn in range(9780000000000, 9780000000100)]
+        batches = shard_volumes(items + items[:10], 4)
+        self.assertEqual(sum(len(batch) for batch in batches), 110)
+        for isbn in range(9780000000000, 9780000000100):
+            shard = get_shard(isbn, 4)
+            self.assertIn(volume(isbn), batches[shard])
+
+    def test_shards_balanced(self):
+        batches = shard_volumes([volume(isbn) for isbn in range(9780000000000, 9780000001000)], 4)
+        for batch in batches:
+            self.assertGreater(len(batch), 150)
+
+    def test_volumes_without_isbn_dropped(self):
+        item = volume(9780000000000)
+        del item['volumeInfo']['industryIdentifiers']
+        self.assertEqual(shard_volumes([item], 2), [[], []])
+
+
+def dying_worker(tasks, results, refresh):
+    tasks.get()
+    os._exit(3)
+
+
+class TestWorkerFailure(SimpleTestCase):
+
+    @mock.patch('books.parallel.POLL_INTERVAL', 0.1)
+    @mock.patch('books.parallel.import_worker', dying_worker)
+    def test_dead_worker_raises(self):
+        items = [volume(isbn) for isbn in range(9780000000000, 9780000000010)]
+        with self.assertRaisesRegex(WorkerDied, 'exited with code 3'):
+            with ShardedImporter(2) as importer:
+                importer.import_volumes(items)
+
+
+class TestShardedImporter(TestCase):
+
+    def test_single_process_imports_inline(self):
+        with ShardedImporter(1) as importer:
+            self.assertEqual(importer.import_volumes([volume(9780000000000), volume(9780000000001)]), 2)
+        self.assertEqual(Book.objects.count(), 2)
+
+    def test_sqlite_falls_back_to_one_process(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'dump.ndjson')
+            with open(path, 'w') as dump:
+                dump.write(json.dumps(volume(9780000000000)))
+            err = io.StringIO()
+            call_command('load_google_dump', path, processes=4, stdout=io.StringIO(), stderr=err)
+        self.assertIn('one process', err.getvalue())
+        self.assertEqual(Book.objects.count(), 1)
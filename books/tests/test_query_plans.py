@@ -0,0 +1,80 @@
+from itertools import combinations
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, skipUnlessDBFeature
+
+from books.filters import BookFilter, ApiBookFilter
+from books.models import Book, Author
+from books.pagination import KeysetPagination
+from books.search import search_authors
+
+
+# title and language use icontains, a substring match no B-tree index can
+# serve; full-text lookups go through the q filter instead.
+INDEXED_FILTERS = {
+    'q': 'harry',
+    'author': 'Dan Brown',
+    'publication_date': '2000-01-01',
+    'publication_date__gt': '2000-01-01',
+    'publication_date__lt': '2010-01-01',
+}
+
+
+def get_plan(queryset):
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+    return queryset.explain()
+
+
+def is_full_scan(plan):
+    if connection.vendor == 'postgresql':
+        return 'Seq Scan' in plan
+    # SQLite reports full table and index scans as SCAN; virtual (FTS5)
+    # tables are always reported as SCAN, even when MATCH is used.
+    return any(
+        ' SCAN ' in f' {line} ' and 'VIRTUAL TABLE' not in line
+        for line in plan.splitlines()
+    )
+
+
+@skipUnlessDBFeature('supports_explaining_query_execution')
+class TestQueryPlans(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = Author.objects.create(name='Dan Brown')
+        book = Book.objects.create(title='Harry Potter', isbn=9780000000001)
+        book.author.add(author)
+
+    def setUp(self):
+        cache.clear()
+
+    def assertNoFullScan(self, queryset, msg=None):
+        plan = get_plan(queryset)
+        self.assertFalse(is_full_scan(plan), f'{msg}\n{plan}')
+
+    def test_filter_combinations(self):
+        for filterset_class in (BookFilter, ApiBookFilter):
+            for size in range(1, len(INDEXED_FILTERS) + 1):
+                for names in combinations(INDEXED_FILTERS, size):
+                    data = {name: INDEXED_FILTERS[name] for name in names}
+                    filter = filterset_class(data, queryset=Book.objects.all())
+                    self.assertTrue(filter.is_valid())
+                    with self.subTest(filterset=filterset_class.__name__, filters=names):
+                        self.assertNoFullScan(filter.qs, names)
+
+    def test_keyset_page(self):
+        paginator = KeysetPagination()
+        queryset = Book.objects.order_by(*paginator.ordering).filter(
+            paginator.get_keyset_filter(['Harry Potter', '00000000-0000-0000-0000-000000000000'], False)
+        )
+        self.assertNoFullScan(queryset[:50])
+
+    def test_import_lookups(self):
+        self.assertNoFullScan(Book.objects.filter(isbn__in=[9780000000001, 9780000000002]))
+        self.assertNoFullScan(Author.objects.filter(name__in=['Dan Brown', 'J. K. Rowling']))
+
+    def test_author_prefix_lookup(self):
+        self.assertNoFullScan(search_authors('Dan').values_list('name', flat=True)[:20])
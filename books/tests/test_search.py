@@ -0,0 +1,100 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from books.models import Book, Author
+from books.search import search_books, index_books, get_terms
+
+
+@override_settings(BOOKS_PAGE_CACHE_TIMEOUT=0)
+class TestSearch(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dan_brown = Author.objects.create(name='Dan Brown')
+        cls.rowling = Author.objects.create(name='J. K. Rowling')
+        cls.da_vinci = Book.objects.create(title='The Da Vinci Code')
+        cls.da_vinci.author.add(cls.dan_brown)
+        cls.goblet = Book.objects.create(title='Harry Potter And The Goblet Of Fire')
+        cls.goblet.author.add(cls.rowling)
+        cls.potter_book = Book.objects.create(title='Harry Potter Studies')
+
+    def setUp(self):
+        cache.clear()
+
+    def search(self, q):
+        return list(search_books(Book.objects.all(), q))
+
+    def test_terms(self):
+        self.assertEqual(get_terms('Harry "Potter*'), ['harry', 'potter'])
+
+    def test_title_search(self):
+        self.assertEqual(self.search('vinci'), [self.da_vinci])
+
+    def test_prefix_search(self):
+        self.assertEqual(set(self.search('harr pott')), {self.goblet, self.potter_book})
+
+    def test_author_search(self):
+        self.assertEqual(self.search('rowling'), [self.goblet])
+
+    def test_title_matches_ranked_first(self):
+        biography = Book.objects.create(title='Rowling: A Biography')
+        self.assertEqual(self.search('rowling'), [biography, self.goblet])
+
+    def test_index_follows_writes(self):
+        self.da_vinci.title = 'Angels And Demons'
+        self.da_vinci.save()
+        self.assertEqual(self.search('vinci'), [])
+        self.assertEqual(self.search('angels'), [self.da_vinci])
+
+        self.da_vinci.author.remove(self.dan_brown)
+        self.assertEqual(self.search('brown'), [])
+        self.dan_brown.book_set.add(self.da_vinci)
+        self.assertEqual(self.search('brown'), [self.da_vinci])
+        self.dan_brown.book_set.clear()
+        self.assertEqual(self.search('brown'), [])
+
+    def test_author_rename_and_delete(self):
+        self.dan_brown.name = 'Daniel Brown'
+        self.dan_brown.save()
+        self.assertEqual(self.search('daniel'), [self.da_vinci])
+        self.dan_brown.delete()
+        self.assertEqual(self.search('daniel'), [])
+
+    def test_deleted_book_not_found(self):
+        self.da_vinci.delete()
+        self.assertEqual(self.search('vinci'), [])
+
+    def test_rebuild(self):
+        index_books()
+        self.assertEqual(self.search('vinci'), [self.da_vinci])
+
+    def test_book_list_search(self):
+        response = self.client.get(reverse('book_list'), {'q': 'vinci'})
+        self.assertEqual(list(response.context['books']), [self.da_vinci])
+
+    def test_api_search(self):
+        response = self.client.get(reverse('BookList'), {'q': 'goblet'})
+        titles = [book['title'] for book in response.json()['results']]
+        self.assertEqual(titles, [self.goblet.title])
+
+    def test_api_search_with_filters(self):
+        response = self.client.get(reverse('BookList'), {'q': 'harry', 'author': 'J. K. Rowling'})
+        titles = [book['title'] for book in response.json()['results']]
+        self.assertEqual(titles, [self.goblet.title])
+
+    def test_api_search_ranked_across_pages(self):
+        books = [Book.objects.create(title=title) for title in (
+            'Apple cooking', 'Zebra cooking cooking cooking', 'Melon cooking cooking'
+        )]
+        ranked = self.search('cooking')
+        self.assertEqual(ranked, [books[1], books[2], books[0]])
+        titles = []
+        url = reverse('BookList') + '?q=cooking&page_size=1'
+        while url:
+            data = self.client.get(url).json()
+            titles += [book['title'] for book in data['results']]
+            url = data['next']
+        self.assertEqual(titles, [book.title for book in ranked])
+        previous = self.client.get(data['previous']).json()
+        self.assertEqual([book['title'] for book in previous['results']], [ranked[1].title])
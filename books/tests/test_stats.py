@@ -0,0 +1,130 @@
+import datetime
+import io
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from books.functions import import_volumes
+from books.models import Author, Book, FacetCount
+from books.stats import get_facets, rebuild_facets
+from books.tests.utils import volume
+
+
+def get_counts():
+    return {(facet, value): count for facet, value, count in FacetCount.objects.values_list('facet', 'value', 'count')}
+
+
+class TestFacetCounts(TestCase):
+
+    def test_book_writes(self):
+        book = Book.objects.create(title='Inferno', language='en', publication_date=datetime.date(2013, 5, 14))
+        Book.objects.create(title='Origin', language='en')
+        self.assertEqual(get_counts(), {('language', 'en'): 2, ('year', '2013'): 1})
+
+        book.language = 'pl'
+        book.publication_date = datetime.date(2014, 1, 1)
+        book.save()
+        self.assertEqual(get_counts(), {('language', 'en'): 1, ('language', 'pl'): 1, ('year', '2014'): 1})
+
+        book.delete()
+        self.assertEqual(get_counts(), {('language', 'en'): 1})
+
+    def test_author_links(self):
+        book = Book.objects.create(title='Inferno')
+        other = Book.objects.create(title='Origin')
+        dan = Author.objects.create(name='Dan Brown')
+        book.author.add(dan)
+        dan.book_set.add(other)
+        self.assertEqual(get_counts(), {('author', 'Dan Brown'): 2})
+
+        book.author.remove(dan)
+        self.assertEqual(get_counts(), {('author', 'Dan Brown'): 1})
+
+        dan.name = 'D. Brown'
+        dan.save()
+        self.assertEqual(get_counts(), {('author', 'D. Brown'): 1})
+
+        other.author.clear()
+        self.assertEqual(get_counts(), {})
+
+        other.author.add(dan)
+        other.delete()
+        self.assertEqual(get_counts(), {})
+
+    def test_author_rows_updated_in_place(self):
+        dan = Author.objects.create(name='Dan Brown')
+        Book.objects.create(title='Inferno').author.add(dan)
+        row_id = FacetCount.objects.get().id
+        Book.objects.create(title='Origin').author.add(dan)
+        self.assertEqual(FacetCount.objects.values_list('id', 'count').get(), (row_id, 2))
+
+    def test_author_deleted(self):
+        Book.objects.create(title='Inferno').author.add(Author.objects.create(name='Dan Brown'))
+        Author.objects.get().delete()
+        self.assertEqual(get_counts(), {})
+
+    def test_import(self):
+        import_volumes([
+            volume(9780000000001, authors=['Dan Brown']),
+            volume(9780000000002, authors=['Dan Brown', 'J. K. Rowling']),
+        ])
+        import_volumes([volume(9780000000002, authors=['Dan Brown'])])
+        self.assertEqual(get_counts(), {
+            ('language', 'en'): 2,
+            ('year', '2003'): 2,
+            ('author', 'Dan Brown'): 2,
+            ('author', 'J. K. Rowling'): 1,
+        })
+
+    def test_refresh(self):
+        import_volumes([volume(9780000000001)])
+        item = volume(9780000000001)
+        item['volumeInfo'].update(language='pl', publishedDate='2005')
+        import_volumes([item], refresh=True)
+        self.assertEqual(get_counts(), {('language', 'pl'): 1, ('year', '2005'): 1})
+
+    def test_rebuild_matches_incremental_counts(self):
+        import_volumes([volume(9780000000001, authors=['Dan Brown']), volume(9780000000002)])
+        Book.objects.create(title='Inferno', language='pl').author.add(Author.objects.get())
+        counts = get_counts()
+        FacetCount.objects.update(count=100)
+        out = io.StringIO()
+        call_command('rebuild_facets', stdout=out)
+        self.assertEqual(get_counts(), counts)
+        self.assertIn('Stored 4 facet counts', out.getvalue())
+        self.assertEqual(rebuild_facets(), 4)
+
+
+class TestFacetReads(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(5):
+            Book.objects.create(title=f'Book {i}', language='en' if i else 'pl')
+
+    def test_most_common_first(self):
+        facets = get_facets()
+        self.assertEqual(facets['language'], [{'value': 'en', 'count': 4}, {'value': 'pl', 'count': 1}])
+        self.assertEqual(facets['year'], [])
+
+    def test_query_count_does_not_depend_on_book_count(self):
+        with self.assertNumQueries(3):
+            get_facets()
+        Book.objects.create(title='Book 5', language='de')
+        with self.assertNumQueries(3):
+            get_facets()
+
+    @override_settings(BOOKS_FACET_LIMIT=1)
+    def test_limit(self):
+        self.assertEqual(get_facets()['language'], [{'value': 'en', 'count': 4}])
+
+    @override_settings(BOOKS_PAGE_CACHE_TIMEOUT=0)
+    def test_api(self):
+        response = self.client.get(reverse('facet_list'))
+        self.assertEqual(response.json()['language'][0], {'value': 'en', 'count': 4})
+
+    @override_settings(BOOKS_PAGE_CACHE_TIMEOUT=0)
+    def test_home_view(self):
+        response = self.client.get(reverse('home_view'))
+        self.assertContains(response, '?language=en')
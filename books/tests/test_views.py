@@ -1,9 +1,22 @@
-from django.test import TestCase
+import base64
+import json
+import uuid
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from books.models import Book, Author
+from django import forms
 
+from books.cache import bump_catalogue_version
+from books.filters import BookFilter
+from books.functions import get_query
+from books.models import Book, Author, ImportJob
 
+
+@override_settings(BOOKS_PAGE_CACHE_TIMEOUT=0)
 class TestBookListView(TestCase):
 
     @classmethod
@@ -15,6 +28,9 @@ class TestBookListView(TestCase):
             title = 'Harry Potter And The Goblet Of Fire'
         )
 
+    def setUp(self):
+        cache.clear()
+
     def test_view_url_exists(self):
         response = self.client.get('/books/list/')
         self.assertEqual(response.status_code, 200)
@@ -41,6 +57,32 @@ class TestBookListView(TestCase):
         self.assertIn(self.book_1, response.context['books'])
         self.assertNotIn(self.book_2, response.context['books'])
 
+    @override_settings(BOOKS_PER_PAGE=1)
+    def test_view_paginates_books(self):
+        url = reverse('book_list')
+        first = self.client.get(url)
+        second = self.client.get(url, {'page': 2})
+        self.assertEqual(list(first.context['books']), [self.book_2])
+        self.assertEqual(list(second.context['books']), [self.book_1])
+        self.assertContains(first, 'page=2')
+
+    @override_settings(BOOKS_PER_PAGE=1)
+    def test_view_keeps_filters_across_pages(self):
+        url = reverse('book_list')
+        response = self.client.get(url, {'language': 'en', 'page': 1})
+        self.assertEqual(response.context['query_string'], 'language=en')
+
+    def test_view_query_count_does_not_depend_on_page_size(self):
+        author = Author.objects.create(name='Dan Brown')
+        for i in range(10):
+            Book.objects.create(title=f'Book {i}').author.add(author)
+        url = reverse('book_list')
+        self.client.get(url)
+        for page_size in (2, 10):
+            with override_settings(BOOKS_PER_PAGE=page_size):
+                with self.assertNumQueries(4):
+                    self.client.get(url)
+
 
 class TestBookAddView(TestCase):
 
@@ -111,6 +153,39 @@ class TestBookEditView(TestCase):
         self.assertRedirects(response, reverse('book_list'))
         self.assertEqual(edited_book.title, 'Harry Potter')
 
+    def edit_data(self, *names):
+        data = {'form-TOTAL_FORMS': '3', 'form-INITIAL_FORMS': '0', 'title': 'Harry Potter'}
+        for i, name in enumerate(names):
+            data[f'form-{i}-name'] = name
+        return data
+
+    def test_view_reuses_authors(self):
+        url = reverse('book_edit', kwargs={'pk': self.book.pk})
+        author = Author.objects.create(name='J. K. Rownling')
+        for _ in range(2):
+            self.client.post(url, self.edit_data('J. K. Rownling', 'Dan Brown', 'Dan Brown'))
+        self.assertEqual(Author.objects.count(), 2)
+        self.assertEqual(
+            sorted(self.book.author.values_list('name', flat=True)),
+            ['Dan Brown', 'J. K. Rownling']
+        )
+        self.assertIn(author, self.book.author.all())
+
+    def test_view_replaces_authors(self):
+        url = reverse('book_edit', kwargs={'pk': self.book.pk})
+        self.client.post(url, self.edit_data('J. K. Rownling', 'Dan Brown'))
+        self.client.post(url, self.edit_data('Dan Brown'))
+        self.assertEqual(list(self.book.author.values_list('name', flat=True)), ['Dan Brown'])
+
+    def test_query_count_does_not_depend_on_author_count(self):
+        url = reverse('book_edit', kwargs={'pk': self.book.pk})
+        Author.objects.bulk_create([Author(name=name) for name in ('A', 'B', 'C')])
+        self.client.post(url, self.edit_data('A'))
+        with self.assertNumQueries(28):
+            self.client.post(url, self.edit_data('B'))
+        with self.assertNumQueries(28):
+            self.client.post(url, self.edit_data('A', 'C'))
+
 
 class TestBookDeleteView(TestCase):
 
@@ -158,16 +233,19 @@ class TestBookImportView(TestCase):
         response = self.client.get(url)
         self.assertTemplateUsed(response, 'books/book_import.html')
 
-    def test_view_creates_books(self):
+    def test_view_creates_job(self):
         url = reverse('book_import')
         data = {
             'key_word': 'Da Vinci',
             'title': 'The Da Vinci Code'
         }
-        self.client.post(url, data)
-        self.assertGreater(Book.objects.count(), 0)
+        response = self.client.post(url, data)
+        job = ImportJob.objects.get()
+        self.assertEqual(job.status, ImportJob.PENDING)
+        self.assertEqual(job.query, get_query(key_word='Da Vinci', title='The Da Vinci Code'))
+        self.assertRedirects(response, reverse('import_job_detail', kwargs={'pk': job.pk}))
 
-    def test_view_no_books_to_import(self):
+    def test_view_does_not_import_books(self):
         url = reverse('book_import')
         data = {
             'key_word': 'Da Vinci',
@@ -175,8 +253,40 @@ class TestBookImportView(TestCase):
             'author': 'George R. R. Martin',
             'isbn': '123254675423'
         }
-        response = self.client.post(url, data)
-        self.assertRedirects(response, reverse('book_list'))
+        with self.assertNumQueries(1):
+            self.client.post(url, data)
+        self.assertEqual(Book.objects.count(), 0)
+
+
+class TestImportJobViews(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.job = ImportJob.objects.create(query='https://example.com/volumes?q=A')
+
+    def test_detail_view(self):
+        url = reverse('import_job_detail', kwargs={'pk': self.job.pk})
+        response = self.client.get(url)
+        self.assertTemplateUsed(response, 'books/import_job.html')
+        self.assertContains(response, 'Pending')
+
+    def test_status_view(self):
+        url = reverse('import_job_status', kwargs={'pk': self.job.pk})
+        response = self.client.get(url)
+        self.assertEqual(response.json()['status'], ImportJob.PENDING)
+        self.assertEqual(response.json()['imported_books'], 0)
+
+    def test_status_view_unknown_job(self):
+        url = reverse('import_job_status', kwargs={'pk': uuid.uuid4()})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 404)
+
+    def test_cancel_view(self):
+        url = reverse('import_job_cancel', kwargs={'pk': self.job.pk})
+        response = self.client.post(url)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, ImportJob.CANCELLED)
+        self.assertRedirects(response, reverse('import_job_detail', kwargs={'pk': self.job.pk}))
 
 
 class TestAuthorCreateView(TestCase):
@@ -201,4 +311,140 @@ class TestAuthorCreateView(TestCase):
         response = self.client.post(url, data)
         author = Author.objects.get(pk=1)
         self.assertRedirects(response, reverse('book_list'))
-        self.assertEqual(author.name, 'Dan Brown')
\ No newline at end of file
+        self.assertEqual(author.name, 'Dan Brown')
+
+
+@override_settings(BOOKS_PAGE_CACHE_TIMEOUT=0)
+class TestBookListApi(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(5):
+            Book.objects.create(title=f'Book {i}')
+            Book.objects.create(title='Same title')
+
+    def get_titles(self, response):
+        return [book['title'] for book in response.json()['results']]
+
+    def test_first_page(self):
+        response = self.client.get(reverse('BookList'), {'page_size': 3})
+        self.assertEqual(self.get_titles(response), ['Book 0', 'Book 1', 'Book 2'])
+        self.assertIsNotNone(response.json()['next'])
+        self.assertIsNone(response.json()['previous'])
+
+    def test_walk_all_pages(self):
+        url = reverse('BookList') + '?page_size=3'
+        titles = []
+        while url:
+            response = self.client.get(url)
+            titles += self.get_titles(response)
+            url = response.json()['next']
+        expected = list(Book.objects.order_by('title', 'id').values_list('title', flat=True))
+        self.assertEqual(titles, expected)
+
+    def test_previous_page(self):
+        response = self.client.get(reverse('BookList'), {'page_size': 4})
+        second = self.client.get(response.json()['next'])
+        third = self.client.get(second.json()['next'])
+        previous = self.client.get(third.json()['previous'])
+        self.assertEqual(self.get_titles(previous), self.get_titles(second))
+
+    def test_page_query_count_does_not_depend_on_depth(self):
+        url = reverse('BookList') + '?page_size=2'
+        query_counts = []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            query_counts.append(len(queries))
+            url = response.json()['next']
+        self.assertEqual(len(query_counts), 5)
+        self.assertEqual(len(set(query_counts)), 1)
+
+    def test_author_ids(self):
+        author = Author.objects.create(name='Dan Brown')
+        Book.objects.get(title='Book 0').author.add(author)
+        response = self.client.get(reverse('BookList'), {'page_size': 1})
+        self.assertEqual(response.json()['results'][0]['author'], [author.pk])
+
+    def test_embed_author_names(self):
+        author = Author.objects.create(name='Dan Brown')
+        Book.objects.get(title='Book 0').author.add(author)
+        response = self.client.get(reverse('BookList'), {'page_size': 1, 'embed': 'authors'})
+        self.assertEqual(response.json()['results'][0]['author'], ['Dan Brown'])
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        authors = [Author.objects.create(name=f'Author {i}') for i in range(3)]
+        for book in Book.objects.all():
+            book.author.set(authors)
+        for page_size in (1, 5, 10):
+            for params, queries in (({}, 4), ({'embed': 'authors'}, 3)):
+                with self.assertNumQueries(queries):
+                    self.client.get(reverse('BookList'), dict(params, page_size=page_size))
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('BookList'), {'cursor': 'invalid'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_tampered_cursor(self):
+        cursors = [
+            [False, ['x', 'not-a-uuid']],
+            [False, ['x', None]],
+            [True, [1.5, 'x']],
+            [False, {'title': 'x', 'id': 'y'}],
+        ]
+        for data in cursors:
+            cursor = base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+            response = self.client.get(reverse('BookList'), {'cursor': cursor})
+            self.assertEqual(response.status_code, 404, data)
+
+        cursor = base64.urlsafe_b64encode(json.dumps([False, ['high', str(uuid.uuid4())]]).encode()).decode()
+        response = self.client.get(reverse('BookList'), {'q': 'b', 'cursor': cursor})
+        self.assertEqual(response.status_code, 404)
+
+
+class TestAuthorChoices(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for name in ('Dan Brown', 'Dan Simmons', 'J. K. Rowling'):
+            Author.objects.create(name=name)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_choices_cached(self):
+        form = BookFilter({}).form
+        self.assertEqual(len(list(form.fields['author'].choices)), 4)
+        # Only the catalogue version is read.
+        with self.assertNumQueries(1):
+            self.assertEqual(len(list(BookFilter({}).form.fields['author'].choices)), 4)
+
+    def test_choices_follow_writes_of_other_processes(self):
+        list(BookFilter({}).form.fields['author'].choices)
+        # An import worker inserts an author and bumps the shared version,
+        # leaving this process's cache untouched.
+        Author.objects.bulk_create([Author(name='Dan Abnett')])
+        bump_catalogue_version()
+        choices = [name for name, _ in BookFilter({}).form.fields['author'].choices]
+        self.assertIn('Dan Abnett', choices)
+
+    def test_filter_by_author(self):
+        book = Book.objects.create(title='The Da Vinci Code')
+        book.author.add(Author.objects.get(name='Dan Brown'))
+        filter = BookFilter({'author': 'Dan Brown'}, queryset=Book.objects.all())
+        self.assertEqual(list(filter.qs), [book])
+
+    @override_settings(BOOKS_AUTHOR_CHOICES_LIMIT=2)
+    def test_text_input_above_limit(self):
+        form = BookFilter({}).form
+        self.assertIsInstance(form.fields['author'].widget, forms.TextInput)
+        self.assertIn(reverse('author_autocomplete'), str(form['author']))
+
+    def test_autocomplete(self):
+        response = self.client.get(reverse('author_autocomplete'), {'q': 'Dan'})
+        self.assertEqual(response.json()['results'], ['Dan Brown', 'Dan Simmons'])
+
+    def test_autocomplete_empty_prefix(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('author_autocomplete'), {'q': ' '})
+        self.assertEqual(response.json()['results'], [])
@@ -0,0 +1,60 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+
+class StubServer:
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.requests = []
+        self.connections = []
+        stub = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                query = {key: values[0] for key, values in parse_qs(url.query).items()}
+                stub.requests.append((url.path, query, dict(self.headers)))
+                stub.connections.append(self.client_address)
+                status, headers, body = stub.handler(url.path, query, self.headers)
+                if not isinstance(body, bytes):
+                    body = json.dumps(body).encode()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), RequestHandler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def volume(isbn, title='Title', authors=()):
+    return {
+        'volumeInfo': {
+            'title': title,
+            'authors': list(authors),
+            'publishedDate': '2003',
+            'industryIdentifiers': [
+                {'type': 'ISBN_13', 'identifier': str(isbn)}
+            ],
+            'pageCount': 100,
+            'language': 'en'
+        }
+    }
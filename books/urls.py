@@ -1,15 +1,34 @@
+from django.conf import settings
 from django.urls import path
 
 from books import views
 
 
+if settings.BOOKS_ASYNC_VIEWS:
+    from books import async_views
+
+    book_import = async_views.book_import
+    book_list_api = async_views.book_list
+else:
+    book_import = views.book_import
+    book_list_api = views.BookList.as_view()
+
+
 urlpatterns = [
     path('', views.home_view, name='home_view'),
     path('books/list/', views.book_list, name='book_list'),
     path('books/edit/<uuid:pk>/', views.book_edit, name='book_edit'),
     path('books/delete/<uuid:pk>/', views.BookDeleteView.as_view(), name='book_delete'),
-    path('books/import/', views.book_import, name='book_import'),
+    path('books/cover/<uuid:pk>/', views.book_cover, name='book_cover'),
+    path('books/import/', book_import, name='book_import'),
+    path('books/import/<uuid:pk>/', views.import_job_detail, name='import_job_detail'),
+    path('books/import/<uuid:pk>/status/', views.import_job_status, name='import_job_status'),
+    path('books/import/<uuid:pk>/cancel/', views.import_job_cancel, name='import_job_cancel'),
     path('books/add/', views.book_add, name='book_add'),
     path('books/author/add', views.AuthorCreateView.as_view(), name='author_add'),
-    path('api/', views.BookList.as_view(), name='BookList')
+    path('books/author/autocomplete/', views.author_autocomplete, name='author_autocomplete'),
+    path('api/', book_list_api, name='BookList'),
+    path('api/facets/', views.facet_list, name='facet_list'),
+    path('api/export.<str:export_format>', views.book_export, name='book_export'),
+    path('metrics', views.metrics_view, name='metrics')
 ]
\ No newline at end of file
@@ -1,30 +1,62 @@
 from rest_framework import generics
 
-from django.shortcuts import redirect, render
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import require_POST, require_safe
 from django.views.generic.edit import DeleteView, CreateView
 from django.urls import reverse_lazy
 
-from books.models import Book, Author
+from books.models import Book, Author, ImportJob
 from books.forms import BookForm, AuthorFormset, GoogleApiForm
 from books.forms import AuthorForm
-from books.functions import get_query, get_books_from_google
+from books.functions import get_query, resolve_authors
+from books.jobs import submit_job, cancel_job
 from books.filters import BookFilter, ApiBookFilter
-from books.serializers import BookSerializer
+from books.serializers import BookSerializer, embeds_authors
+from books.export import CONTENT_TYPES, export_books
+from books.pagination import KeysetPagination
+from books.search import search_authors
+from books.stats import get_facets
+from books.cache import cache_catalogue_page, catalogue_condition
+from books.covers import CONTENT_TYPES as COVER_CONTENT_TYPES, get_cover_store, prefetch_cover
+from books import metrics
 
 
+@cache_catalogue_page
 def home_view(request):
-    return render(request, 'books/home_view.html')
+    return render(request, 'books/home_view.html', {'facets': get_facets()})
 
 
+@catalogue_condition
+@cache_catalogue_page
 def book_list(request):
-    filter = BookFilter(request.GET, queryset=Book.objects.all().prefetch_related('author'))
+    filter = BookFilter(request.GET, queryset=Book.objects.all(), request=request)
     books = filter.qs
-    context = {'filter': filter, 'books': books}
+    if not books.ordered:
+        books = books.order_by('title', 'id')
+    paginator = Paginator(books, settings.BOOKS_PER_PAGE)
+    page = paginator.get_page(request.GET.get('page'))
+    query = request.GET.copy()
+    query.pop('page', None)
+    context = {'filter': filter, 'books': page, 'query_string': query.urlencode()}
     return render(request, 'books/book_list.html', context)
 
 
+def save_book(form, formset):
+    names = [inline_form.cleaned_data.get('name') for inline_form in formset]
+    with transaction.atomic():
+        book = form.save()
+        book.author.set(resolve_authors(name for name in names if name).values())
+    return book
+
+
 def book_add(request):
-    
+
     if request.method == 'GET':
         form = BookForm()
         formset = AuthorFormset()
@@ -33,18 +65,8 @@ def book_add(request):
         form = BookForm(request.POST)
         formset = AuthorFormset(request.POST)
 
-        print(form.is_valid())
-        print(formset.is_valid())
         if form.is_valid() and formset.is_valid():
-            book = form.save()
-            for inline_form in formset:
-                if inline_form.cleaned_data:
-                    if len(inline_form.cleaned_data['name']) > 0:
-                        author = inline_form.save()
-                        book.author.add(author)
-
-            book.save()
-
+            save_book(form, formset)
             return redirect('book_list')
 
     context = {'form': form, 'formset': formset}
@@ -53,28 +75,19 @@ def book_add(request):
 
 def book_edit(request, pk):
 
-    book = Book.objects.get(id=pk)
+    book = get_object_or_404(Book, id=pk)
     initial = [{'name': author.name} for author in book.author.all()]
 
     if request.method == 'GET':
         form = BookForm(instance=book)
         formset = AuthorFormset(initial=initial)
 
-    elif request.method == 'POST': 
+    elif request.method == 'POST':
         form = BookForm(request.POST, instance=book)
-        formset = AuthorFormset(request.POST, initial=initial)
+        formset = AuthorFormset(request.POST)
 
         if form.is_valid() and formset.is_valid():
-            book = form.save()
-            book.author.clear()
-            for inline_form in formset:
-                if inline_form.cleaned_data:
-                    if len(inline_form.cleaned_data['name']) > 0:
-                        author = inline_form.save()
-                        book.author.add(author)
-
-            book.save()
-            
+            save_book(form, formset)
             return redirect('book_list')
 
     context = {'form': form, 'formset': formset}
@@ -95,12 +108,42 @@ def book_import(request):
         form = GoogleApiForm(request.POST)
         if form.is_valid():
             query = get_query(**form.cleaned_data)
-            get_books_from_google(query)
+            job = submit_job(query)
+            return redirect('import_job_detail', pk=job.pk)
         return redirect('book_list')
 
     return render(request, 'books/book_import.html', {'form': form})
 
 
+def import_job_detail(request, pk):
+    job = get_object_or_404(ImportJob, pk=pk)
+    return render(request, 'books/import_job.html', {'job': job})
+
+
+def import_job_status(request, pk):
+    job = get_object_or_404(ImportJob, pk=pk)
+    return JsonResponse({
+        'id': job.pk,
+        'query': job.query,
+        'status': job.status,
+        'cancel_requested': job.cancel_requested,
+        'fetched_items': job.fetched_items,
+        'imported_books': job.imported_books,
+        'error': job.error,
+        'created_at': job.created_at,
+        'started_at': job.started_at,
+        'heartbeat_at': job.heartbeat_at,
+        'finished_at': job.finished_at
+    })
+
+
+@require_POST
+def import_job_cancel(request, pk):
+    job = get_object_or_404(ImportJob, pk=pk)
+    cancel_job(job)
+    return redirect('import_job_detail', pk=job.pk)
+
+
 class AuthorCreateView(CreateView):
     model = Author
     template_name_suffix = '_add'
@@ -108,7 +151,78 @@ class AuthorCreateView(CreateView):
     success_url = reverse_lazy('book_list')
 
 
+def author_autocomplete(request):
+    prefix = request.GET.get('q', '').strip()
+    names = []
+    if prefix:
+        authors = search_authors(prefix).order_by('name').values_list('name', flat=True).distinct()
+        names = list(authors[:settings.BOOKS_AUTHOR_AUTOCOMPLETE_RESULTS])
+    return JsonResponse({'results': names})
+
+
+def metrics_view(request):
+    return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
+@method_decorator(catalogue_condition, name='dispatch')
+@method_decorator(cache_catalogue_page, name='dispatch')
 class BookList(generics.ListAPIView):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     filterset_class = ApiBookFilter
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if embeds_authors(self.request):
+            return queryset
+        return queryset.prefetch_related('author')
+
+
+@require_safe
+def book_cover(request, pk):
+    image_url = get_object_or_404(Book.objects.exclude(image_url=None).values_list('image_url', flat=True), pk=pk)
+    cached = get_cover_store().get(image_url)
+    cover = None
+    if cached is not None and cached[2] in COVER_CONTENT_TYPES:
+        path, digest, content_type = cached
+        try:
+            cover = open(path, 'rb')
+        except FileNotFoundError:
+            pass
+    if cover is None:
+        # Fetched in the background; send the client upstream meanwhile.
+        prefetch_cover(image_url)
+        return redirect(image_url)
+
+    etag = f'"{digest}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = FileResponse(cover, content_type=content_type)
+    else:
+        cover.close()
+    response['ETag'] = etag
+    # Never render the image as a document or guess another type.
+    response['Content-Security-Policy'] = "default-src 'none'; sandbox"
+    response['X-Content-Type-Options'] = 'nosniff'
+    patch_cache_control(response, public=True, max_age=settings.BOOKS_COVER_MAX_AGE)
+    return response
+
+
+@cache_catalogue_page
+def facet_list(request):
+    return JsonResponse(get_facets())
+
+
+def book_export(request, export_format):
+    if export_format not in CONTENT_TYPES:
+        raise Http404
+    filter = ApiBookFilter(request.GET, queryset=Book.objects.all())
+    if not filter.is_valid():
+        return JsonResponse(filter.errors, status=400)
+    response = StreamingHttpResponse(
+        export_books(filter.qs, export_format),
+        content_type=CONTENT_TYPES[export_format]
+    )
+    response['Content-Disposition'] = f'attachment; filename="books.{export_format}"'
+    return response
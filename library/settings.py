@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
+
 import django_heroku
 from pathlib import Path
 
@@ -44,6 +46,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'books.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -131,6 +134,73 @@ STATICFILES_DIRS = [
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Django REST framework
+
+REST_FRAMEWORK = {
+    'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
+}
+
+# Google Books import
+
+GOOGLE_BOOKS_WORKERS = 4
+GOOGLE_BOOKS_RATE_LIMIT = 10
+GOOGLE_BOOKS_MAX_ITEMS = 1000
+GOOGLE_BOOKS_CACHE_TTL = 60 * 60
+GOOGLE_BOOKS_CACHE_STALE_TTL = 24 * 60 * 60
+GOOGLE_BOOKS_CACHE_SIZE = 256
+# Running jobs without a heartbeat for this long are marked as failed.
+GOOGLE_BOOKS_JOB_LEASE = 10 * 60
+
+# Serve the import and API views as async views, set by library/asgi.py.
+
+BOOKS_ASYNC_VIEWS = os.environ.get('BOOKS_ASYNC_VIEWS') == '1'
+
+# Book list
+
+BOOKS_PER_PAGE = 50
+BOOKS_PAGE_CACHE_TIMEOUT = 10 * 60
+BOOKS_AUTHOR_CHOICES_LIMIT = 500
+BOOKS_AUTHOR_CHOICES_TIMEOUT = 10 * 60
+BOOKS_AUTHOR_AUTOCOMPLETE_RESULTS = 20
+BOOKS_FACET_LIMIT = 10
+
+# Catalogue export
+
+BOOKS_EXPORT_CHUNK_SIZE = 2000
+
+# Cover images cached on local disk
+
+BOOKS_COVER_DIR = BASE_DIR / 'covers'
+BOOKS_COVER_CACHE_SIZE = 256 * 1024 * 1024
+BOOKS_COVER_MAX_BYTES = 2 * 1024 * 1024
+BOOKS_COVER_MAX_AGE = 30 * 24 * 60 * 60
+BOOKS_COVER_WORKERS = 4
+# Only for local development and tests, covers are never fetched from
+# private, loopback or link-local addresses otherwise.
+BOOKS_COVER_ALLOW_PRIVATE_HOSTS = False
+
+# Metrics, shared between processes through the database
+
+BOOKS_METRICS_FLUSH_INTERVAL = 15
+BOOKS_METRICS_RETENTION = 24 * 60 * 60
+
+# Upstream HTTP client
+
+UPSTREAM_TIMEOUT = (3.05, 10)
+UPSTREAM_RETRIES = 3
+UPSTREAM_BACKOFF = 0.5
+UPSTREAM_MAX_BACKOFF = 8
+UPSTREAM_POOL_SIZE = 10
+UPSTREAM_BREAKER_THRESHOLD = 5
+UPSTREAM_BREAKER_RESET = 30
+
 AUTH_USER_MODEL = 'books.User'
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 django_heroku.settings(locals())
+
+# django_heroku adds WhiteNoise's sync-only middleware, which under ASGI
+# would serialize every request; this subclass also runs async.
+MIDDLEWARE = [
+    'books.middleware.StaticFilesMiddleware' if name == 'whitenoise.middleware.WhiteNoiseMiddleware' else name
+    for name in MIDDLEWARE
+]